@@ -1,8 +1,8 @@
 import streamlit as st
-from PIL import Image
+import assets
 
 def app():
     
     st.divider()
-    img_about = Image.open("About_us.jpg")    
+    img_about = assets.image("About_us.jpg", max_width=2000)
     st.image(img_about)
\ No newline at end of file
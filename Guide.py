@@ -1,23 +1,17 @@
 import streamlit as st
-from PIL import Image
+import assets
     
     
+def show_images(*numbers):
+    # Screenshots are only loaded once their section is opened
+    if st.toggle('Show screenshots', key=f"guide_images_{numbers[0]}"):
+        for number in numbers:
+            st.image(assets.image(f'Guide_{number}.png', max_width=1000), width=1000)
+
+
 def app():    
 
     st.divider()
-    img = {
-        '1': Image.open('Guide_1.png'),
-        '2': Image.open('Guide_2.png'),
-        '3': Image.open('Guide_3.png'),
-        '4': Image.open('Guide_4.png'),
-        '5': Image.open('Guide_5.png'),
-        '6': Image.open('Guide_6.png'),
-        '7': Image.open('Guide_7.png'),
-        '8': Image.open('Guide_8.png'),
-        '9': Image.open('Guide_9.png'),
-        '10': Image.open('Guide_10.png'),
-        '11': Image.open('Guide_11.png')
-    }
 
 
     
@@ -40,7 +34,7 @@ You have two options for providing LAS files to the Web Application:
 - Experience the features using a pre-loaded sample LAS file.
 ''')
 
-    st.image(img['1'], width=1000)
+    show_images(1)
 
     st.markdown('''
     ---                
@@ -51,7 +45,7 @@ You have two options for providing LAS files to the Web Application:
     ### 1. LAS File Specification
     Click on **LAS File Specification** in the navigation menu for detailed information about LAS file specifications.
     ''')
-    st.image(img['2'], width=1000)
+    show_images(2)
     
     
     st.markdown('''
@@ -59,19 +53,19 @@ You have two options for providing LAS files to the Web Application:
     ### 2. Well Information
     Click on **Well Information** in the navigation menu to access well-related details such as name, location, and metadata.
     ''')
-    st.image(img['3'], width=1000)
+    show_images(3)
     
     st.markdown('''
     ### 3. Curve Information
     Click on **Curve Information** in the navigation menu to view details about curves present in the LAS file.
     ''')
-    st.image(img['4'], width=1000)
+    show_images(4)
     
     st.markdown('''
     ### 4. Curve Data Overview
     Click on **Curve Data Overview** in the navigation menu for a summarized view of the dataset within the curves.
     ''')
-    st.image(img['5'], width=1000)
+    show_images(5)
     
     st.markdown('''
     ### 5. Interpretation
@@ -82,13 +76,16 @@ You have two options for providing LAS files to the Web Application:
     
     - Go to the selection of Curve Data.
     - Select "DT" (Sonic Log) curve.
-    - After selecting Curve Data, choose checkboxes from the parameters to calculate sonic porosity.
+    - After selecting Curve Data, choose the matrix/fluid porosity tracks to plot.
+    - To use other transit times, edit or add rows under **Matrix and fluid transit times** in the sidebar; every matrix is paired with every fluid.
+    - To add compaction and hydrocarbon corrected tracks, open **Compaction and hydrocarbon correction** in the sidebar, enter the depth interval of a shale (for Cp) and choose the hydrocarbon (for Hy).
+    - For a single track whose matrix and fluid change with depth, open **Lithology zonation** in the sidebar and type the zones (top, base, matrix, fluid) or upload an interval CSV with top, base, lithology and fluid columns.
     
     *Not familiar with curve mnemonics? Learn more in the Additional Info tab in the Web Application Main Menu.*
     
 
     ''')
-    st.image(img['6'], width=1000)
+    show_images(6)
     
     st.markdown('''
     ---
@@ -102,9 +99,7 @@ You have two options for providing LAS files to the Web Application:
     - Depth vs Sonic Porosity Graph 
     - Sonic Log vs Sonic Porosity Graph         
     ''')
-    st.image(img['7'], width=1000)
-    st.image(img['8'], width=1000)
-    st.image(img['9'], width=1000)
+    show_images(7, 8, 9)
     
     
     st.markdown('''
@@ -121,5 +116,4 @@ You have two options for providing LAS files to the Web Application:
     showing the results for each evaluation process.
                     
                     ''')
-    st.image(img['10'], width=1000)
-    st.image(img['11'], width=1000)
\ No newline at end of file
+    show_images(10, 11)
\ No newline at end of file
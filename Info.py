@@ -1,5 +1,6 @@
 import streamlit as st
-from PIL import Image
+import assets
+import porosity
 
 def app():    
 
@@ -10,8 +11,7 @@ def app():
         
         
         # Display the image in Streamlit
-        img_wyllie = Image.open("Sonic_Formula.png")
-        img_wyllie = img_wyllie.resize([int(img_wyllie.width/3), int(img_wyllie.height/3.5)])
+        img_wyllie = assets.image("Sonic_Formula.png", 3, 3.5)
         st.image(img_wyllie, caption= 'Figure 1. Wyllie time average equation')
             
             
@@ -23,16 +23,13 @@ def app():
                     \n Δtma = Rock matrix interval transit time    
                     ''')
     
-        st.markdown('''
-                    
-                    | Material | Transit Time |
-                    | ----------- | ----------- |
-                    | Sandstone | 55.5 |
-                    | Limestone | 47.5 |
-                    | Dolomite | 43.5 |
-                    | Seawater | 189 |
-                    | Freshwater | 204 |
-                    ''')
+        # Same transit times as the porosity calculation uses by default
+        rows = '\n'.join(f'| {name} | {dt:g} |' for name, dt in {**porosity.MATRICES, **porosity.FLUIDS}.items())
+        st.markdown(f'''
+| Material | Transit Time (μsec/ft) |
+| ----------- | ----------- |
+{rows}
+''')
         st.caption('Figure 2. Typical interval transit time for lithologies and fluids')
 
     with col2:  
@@ -47,8 +44,7 @@ def app():
                     analyzing the sonic response in nearby shale (Cp = Δtsh/100.0).
                     \nHy, on the other hand, is an approximate correction factor and is assigned a value of 0.9 for oil and 0.7 for gas reservoirs.
                     \nWith these adjustments, the revised Wyllie time average equation is as follows:''')
-        img_correction = Image.open("Correction.png")
-        img_correction = img_correction.resize([int(img_correction.width/3), int(img_correction.height/3.5)])
+        img_correction = assets.image("Correction.png", 3, 3.5)
         st.image(img_correction, caption= 'Figure 3. Wyllie time average equation with correction')
         st.markdown('''Cp = Compaction correction factor
                     \nHy = Hydrocarbon correction factor  ''')
@@ -66,8 +62,7 @@ def app():
     file_url = "https://www.spwla.org/documents/spwla/Mnemonic/reevesmnemonics.pdf"  # Replace with the actual URL of your PDF file
     st.markdown(f'<a href="{file_url}" download="document.pdf">Click here to download a list of complete tools and curve mnemonics.</a>', unsafe_allow_html=True)
            
-    img_abbrv = Image.open("Curves_Abbrv.png")
-    img_abbrv = img_abbrv.resize([int(img_abbrv.width/1.5), int(img_abbrv.height/1.5)])
+    img_abbrv = assets.image("Curves_Abbrv.png", 1.5, 1.5)
     st.image(img_abbrv, caption= 'Figure 4. List of common log curve abbreviations (mnemonics) and their corresponding names or descriptions' )
     
 
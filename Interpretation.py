@@ -1,11 +1,22 @@
-import lasio
+import os
 import streamlit as st
 import pandas as pd
-import tempfile
-import missingno as msno
+import numpy as np
 from streamlit_option_menu import option_menu
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import porosity
+import las_cache
+import evaluation
+import log_plot
+import batch
+import coverage
+import interpolation
+import units
+import sonic_curves
+import pipeline
+import shared_cache
+import data_table
+import catalog
+import zonation
     
 def app():
     def create_option_menu():
@@ -26,7 +37,10 @@ def app():
         try:
             unit_curve = las_file.curves[selected_curve].unit  # Get unit from the selected curve
             st.sidebar.write(f"Unit of {selected_curve} curve: {unit_curve}")
-            if unit_curve.upper() not in ('US/M', 'US/FT', 'US/F'):
+            original_unit = units.converted_from(las_file.curves[selected_curve])
+            if original_unit:
+                st.sidebar.info(f'**Note**: {selected_curve} was logged in {original_unit} and has been converted to us/ft.')
+            elif not units.is_sonic_unit(unit_curve):
                 st.sidebar.warning('**Note**: Unit must be either (us/m) or (us/ft). Assuming the selected curve data is Sonic and its unit is us/ft.')
         except (NameError, KeyError):
             if selected_curve == "DEPTH":
@@ -34,18 +48,206 @@ def app():
             else:
                 unit_curve = "Unknown"
     
-    def parameters():
-        dt_matrix_sandstone = 55.5
-        dt_matrix_limestone = 47.5
-        dt_matrix_dolomite = 43.5
-        dt_fluid_seawater = 185
-        dt_fluid_freshwater = 189
+    def data_visualization(plot_df, dataset_key):
+        st.markdown("### Data Visualization")
+        porosity_columns = [c for c in plot_df.columns if c not in ('Depth', 'Sonic Log')]
+        selected_columns = st.multiselect('Porosity tracks to plot (Matrix (Fluid)):', porosity_columns)
         
-        return dt_matrix_sandstone, dt_matrix_limestone, dt_matrix_dolomite, dt_fluid_seawater, dt_fluid_freshwater
+        # Sonic log track first, then one track per chosen matrix/fluid
+        tracks = [('Sonic Log', log_plot.SONIC_RANGE)]
+        tracks += [(column, log_plot.POROSITY_RANGE) for column in selected_columns]
+        
+        if plot_df.empty:
+            st.info('No samples in the selected depth window.')
+            return
+        
+        # Depth window shown in the log plot; narrower windows are drawn at higher resolution
+        depth_min, depth_max = float(plot_df['Depth'].min()), float(plot_df['Depth'].max())
+        plot_top, plot_bottom = st.slider('Plot depth window', depth_min, depth_max, (depth_min, depth_max))
+        
+        fig = graph.stage('figure', (dataset_key, tuple(tracks), plot_top, plot_bottom, render_mode, webgl_threshold),
+                          lambda: log_plot.cached_log_figure(dataset_key, plot_df, tracks, plot_top, plot_bottom, render_mode, webgl_threshold))
+        st.markdown("### Log Plot")
+        st.plotly_chart(fig, use_container_width=False, scroll=True, theme=None)
+    
+    
+    def depth_frame(well, curve):
+        # DEPTH and the selected curve only; memory-mapped wells never page in the other curves
+        columns = well.read([curve] if curve in well.curves else [])
+        return pd.DataFrame({'DEPTH': columns.pop(well.index_mnemonic), **columns})
+    
+    def derived_columns(result, correction, zones):
+        # Compaction/hydrocarbon-corrected and zoned porosity of a sweep; a Cp, Hy or zone change only redoes these
+        data = {}
+        if correction is not None:
+            corrected_result = result.corrected(*correction)
+            data.update((c, corrected_result.column(c)) for c in corrected_result.porosity_columns)
+        if zones is not None:
+            data[zonation.ZONED_COLUMN] = zones.porosity(result.depth, result.sonic)
+        return data
+    
+    def porosity_frame(porosity_result, correction, zones):
+        # The cached sweep plus its derived columns
+        return pd.DataFrame({**porosity_result.columns(), **derived_columns(porosity_result, correction, zones)})
+    
+    def paged_table(frame, key):
+        # One page of rows around a chosen depth; the rest of the frame never leaves the server
+        depth = frame['Depth'].to_numpy() if 'Depth' in frame else np.arange(len(frame), dtype=float)
+        start_key = f'{key}_start'
+        col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+        page_size = col2.selectbox('Rows per page', data_table.PAGE_SIZES, index=1, key=f'{key}_rows')
+        
+        def go_to_depth():
+            st.session_state[start_key] = data_table.page_start(depth, st.session_state[f'{key}_depth'], page_size)
+        
+        col1.number_input('Go to depth', value=float(depth[0]) if len(depth) else 0.0, step=100.0,
+                          key=f'{key}_depth', on_change=go_to_depth)
+        start = data_table.clamp_start(st.session_state.get(start_key, 0), len(frame), page_size)
+        col3.markdown('&nbsp;')
+        if col3.button('Previous', key=f'{key}_previous'):
+            start = data_table.clamp_start(start - page_size, len(frame), page_size)
+        col4.markdown('&nbsp;')
+        if col4.button('Next', key=f'{key}_next'):
+            start = data_table.clamp_start(start + page_size, len(frame), page_size)
+        st.session_state[start_key] = start
+        
+        rows, start = data_table.page(frame, start, page_size)
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        st.caption(f'Rows {start + 1 if len(frame) else 0} to {start + len(rows)} of {len(frame)}')
+    
+    def parameter_editor(n_samples=None):
+        # Every matrix is paired with every fluid; rows can be added for custom or gridded transit times.
+        # With n_samples, the sweep is held in full for one well and the combinations are capped
+        with st.sidebar.expander('**Matrix and fluid transit times (us/ft)**', expanded=False):
+            tables = []
+            for label, defaults in (('Matrix', porosity.MATRICES), ('Fluid', porosity.FLUIDS)):
+                table = st.data_editor(
+                    pd.DataFrame({label: list(defaults), 'Transit time': [float(v) for v in defaults.values()]}),
+                    num_rows='dynamic', hide_index=True, key=f'{label.lower()}_parameters')
+                table = table.dropna()
+                tables.append(dict(zip(table[label].astype(str).str.strip(), table['Transit time'])))
+            try:
+                parameters = porosity.ParameterSet(*tables)
+            except ValueError as error:
+                st.warning(f'**Note**: {error}. Using the default transit times.')
+                parameters = porosity.ParameterSet()
+            limit = None if n_samples is None else max(len(porosity.ParameterSet()), porosity.APP_ELEMENTS // max(1, n_samples))
+            if limit is not None and len(parameters) > limit:
+                st.warning(f'**Note**: {len(parameters)} combinations on {n_samples} samples is more than the app holds '
+                           f'(at most {limit}); use sonic_eval.py for larger sweeps. Using the default transit times.')
+                parameters = porosity.ParameterSet()
+            st.caption(f'{len(parameters)} matrix/fluid combinations')
+        return parameters
+    
+    def correction_editor(depth, sonic):
+        # Cp from the mean transit time of a shale interval, Hy from the expected hydrocarbon
+        with st.sidebar.expander('**Compaction and hydrocarbon correction**', expanded=False):
+            if not st.checkbox('Add corrected porosity tracks', key='apply_correction'):
+                return None
+            col1, col2 = st.columns(2)
+            shale_top = col1.number_input('Shale top', min_value=0.0, value=0.0, step=10.0, key='shale_top')
+            shale_bottom = col2.number_input('Shale bottom', min_value=0.0, value=0.0, step=10.0, key='shale_bottom')
+            hydrocarbon = st.selectbox('Hydrocarbon', list(porosity.HYDROCARBON_FACTORS), key='hydrocarbon')
+            dt_shale = porosity.shale_transit_time(depth, sonic, shale_top, shale_bottom)
+            cp = porosity.compaction_factor(dt_shale)
+            hy = porosity.HYDROCARBON_FACTORS[hydrocarbon]
+            if np.isnan(dt_shale):
+                st.caption(f'No sonic samples in the shale interval, Cp = 1. Hy = {hy}')
+            else:
+                st.caption(f'Δtsh = {dt_shale:.1f} us/ft, Cp = {cp:.3f}. Hy = {hy}')
+        return cp, hy
+    
+    def zonation_editor(depth):
+        # Depth zones with their own matrix and fluid, typed in or read from an interval file
+        with st.sidebar.expander('**Lithology zonation**', expanded=False):
+            if not st.checkbox('Add zoned porosity track', key='apply_zonation'):
+                return None
+            interval_file = st.file_uploader('Interval file (CSV: top, base, lithology, fluid)', type=['csv', 'txt'], key='zone_file')
+            table = pd.DataFrame({'Top': [float(np.nanmin(depth))], 'Base': [float(np.nanmax(depth))],
+                                  'Matrix': [next(iter(parameters.matrices))], 'Fluid': [next(iter(parameters.fluids))]})
+            if interval_file is not None:
+                try:
+                    table = zonation.read_intervals(interval_file.getvalue())
+                except ValueError as error:
+                    st.warning(f'**Note**: {error}.')
+            # A new file starts a new editor, so its rows replace the typed ones
+            table = st.data_editor(table, num_rows='dynamic', hide_index=True,
+                                   key=f'zones_{interval_file.file_id if interval_file is not None else "typed"}')
+            try:
+                zones = zonation.Zonation.from_table(table, parameters)
+            except ValueError as error:
+                st.warning(f'**Note**: {error}. No zoned porosity.')
+                return None
+            st.caption(f'{len(zones)} zones; matrix and fluid by name from the transit time table or in us/ft')
+        return zones
+    
+    def catalog_browser():
+        # Header-only index of many LAS files; returns the path of the well to open, or None
+        directory = st.sidebar.text_input('Directory to index:', value='', key='catalog_directory')
+        if st.sidebar.button('Update catalog') and directory:
+            if os.path.isdir(directory):
+                counts = catalog.update([directory])
+                st.sidebar.success(', '.join(f'{count} {name}' for name, count in counts.items()))
+            else:
+                st.sidebar.warning(f'**Note**: {directory} is not a directory.')
+        
+        st.markdown("### Well Catalog")
+        col1, col2, col3, col4 = st.columns(4)
+        text = col1.text_input('Well, company or path', key='catalog_text')
+        mnemonic = col2.text_input('Has curve', key='catalog_mnemonic').strip()
+        top = col3.number_input('Covers top depth', min_value=0.0, value=None, step=100.0, key='catalog_top')
+        bottom = col4.number_input('Covers bottom depth', min_value=0.0, value=None, step=100.0, key='catalog_bottom')
+        sonic_only = st.checkbox('Only wells with a sonic curve', value=True, key='catalog_sonic')
+        wells = catalog.search(text=text, mnemonic=mnemonic, top=top, bottom=bottom, sonic_only=sonic_only)
+        st.dataframe(wells, hide_index=True, use_container_width=True)
+        if wells.empty:
+            st.info('No wells found. Index a directory of LAS files from the sidebar, or relax the filters.')
+            return None
+        path = st.selectbox('Open well:', wells['Path'], key='catalog_path')
+        return path if os.path.exists(path) else None
+    
+    def batch_evaluation():
+        st.markdown("### Batch Evaluation")
+        files = st.sidebar.file_uploader('Upload LAS files to evaluate.', accept_multiple_files=True)
+        directory = st.sidebar.text_input('Or evaluate every LAS file in a directory:', value='')
+        sonic_curve = st.sidebar.text_input('Sonic curve (blank to detect):', value='').strip() or None
+        max_gap = st.sidebar.number_input('Longest gap to interpolate (0 = any):', min_value=0.0, value=0.0, step=10.0)
+        parameters = parameter_editor()
+        
+        sources = [(f.name, f.getvalue()) for f in files or []]
+        if directory:
+            if os.path.isdir(directory):
+                sources += batch.list_las_files(directory)
+            else:
+                st.sidebar.warning(f'**Note**: {directory} is not a directory.')
+        
+        if not sources:
+            st.info('Upload LAS files or enter a directory to evaluate several wells at once.')
+            return
+        st.markdown('Sonic curve of each well, resolved from its ~Curve block:')
+        st.dataframe(batch.resolve_sources(sources, sonic_curve), hide_index=True)
+        if not st.button(f'Evaluate {len(sources)} wells'):
+            return
+        
+        with st.spinner('Evaluating wells...'):
+            result = batch.run_batch(sources, sonic_curve, max_gap=max_gap, parameters=parameters)
+        
+        throughput = result.throughput()
+        col1, col2, col3 = st.columns(3)
+        col1.metric('Wells/sec', f"{throughput['Wells/sec']:.2f}")
+        col2.metric('Rows/sec', f"{throughput['Rows/sec']:,.0f}")
+        col3.metric('Elapsed', f"{throughput['Seconds']:.2f} s ({throughput['Workers']} workers)")
+        st.dataframe(result.overview(), hide_index=True)
+        
+        for summary, stats in zip(result.summaries, result.stats):
+            with st.expander(f"**{summary['Source']}** ({summary['Well']})", expanded=False):
+                if stats is None:
+                    st.error(summary['Error'])
+                else:
+                    st.dataframe(stats, hide_index=True)
     
     
     st.set_option('deprecation.showfileUploaderEncoding', False)
-    tfile = None
     file = None
     selected_tab = None
     las_df = pd.DataFrame()
@@ -53,92 +255,79 @@ def app():
     st.divider()
     mode = st.sidebar.radio(
         "**Select data source:**",
-        ('Upload LAS file', 'Use sample LAS file')
+        ('Upload LAS file', 'Use sample LAS file', 'Open well from catalog', 'Batch evaluate LAS files')
     )
+    if mode == 'Batch evaluate LAS files':
+        batch_evaluation()
+        return
+    
+    # Each stage below recomputes only when its declared inputs change
+    graph = pipeline.ComputationGraph(st.session_state)
+    
     try:
         if mode == 'Upload LAS file':
             file = st.sidebar.file_uploader('Upload a LAS file containing Sonic Log.')
             if file is not None:
-                # Create a temporary file and save the uploaded file's content into it
-                with tempfile.NamedTemporaryFile(delete=False) as tfile:
-                    tfile.write(file.read())
-                    las_file = lasio.read(tfile.name)
-                    las_df = las_file.df()
-                    las_df[las_df < -9000] = None
+                # Parsed wells are cached on a hash of the uploaded bytes
+                las_file = graph.stage('parse', ('upload', file.file_id, file.size), lambda: las_cache.load_las_bytes(file.getvalue()))
             
     
+        if mode == 'Open well from catalog':
+            file = catalog_browser()
+            if file:
+                las_file = graph.stage('parse', ('path', file, os.path.getmtime(file)), lambda: las_cache.load_las_path(file))
+            
         if mode == 'Use sample LAS file':
             file = r"Sample.las"
-            las_file = lasio.read(file)
-            las_df = las_file.df()
-            las_df = las_df.replace(-9999.25, None)
+            las_file = graph.stage('parse', ('path', file, os.path.getmtime(file)), lambda: las_cache.load_las_path(file))
         
         if file:
           selected_tab = create_option_menu()
-          las_df.insert(0, 'DEPTH', las_df.index)
-          las_df.reset_index(drop=True, inplace=True)
             
          
-        selected_curve = st.sidebar.selectbox("**Select curve data to visualize:**", las_df.keys())
+        # Sonic candidates from the ~Curve block come first, best ranked preselected
+        sonic_candidates = sonic_curves.sonic_index(las_file).ranked() if file else []
+        curve_names = ['DEPTH'] + list(las_file.curves)[1:] if file else []
+        curve_options = sonic_candidates + [c for c in curve_names if c not in sonic_candidates]
+        selected_curve = st.sidebar.selectbox("**Select curve data to visualize:**", curve_options)
+        if file:
+          las_df = graph.stage('frame', (las_file.key, selected_curve), lambda: depth_frame(las_file, selected_curve), shared=True)
+        if sonic_candidates:
+            st.sidebar.caption(f"Detected sonic curves: {', '.join(sonic_candidates)}")
         visualize_curve_data(selected_curve)
-        dt_matrix_sandstone, dt_matrix_limestone, dt_matrix_dolomite, dt_fluid_seawater, dt_fluid_freshwater = parameters()
+        render_mode = st.sidebar.selectbox("**Log plot rendering:**", log_plot.RENDER_MODES)
+        webgl_threshold = st.sidebar.number_input("WebGL above (points per plot)", min_value=0, value=log_plot.WEBGL_THRESHOLD, step=1000)
+        parameters = parameter_editor(len(las_file.index))
+        correction = None
+        zones = zones_key = None
 
 
             
     # Sonic Porosity Calculation
-        data = []
-        temporary = []
+        las_df_revised = pd.DataFrame()
         
         
         if selected_curve in las_file.keys():
-            for depth, sonic_log in zip(las_df['DEPTH'], las_df[selected_curve]):
-                # Always include depth and Sonic Log Reading
-                row_data = {"Depth": depth, 'Sonic Log': sonic_log}
-                if sonic_log is not None:
-            
-                    phi_sandstone_seawater = round(((sonic_log - dt_matrix_sandstone) / (dt_fluid_seawater - dt_matrix_sandstone)), 4)
-                    row_data['Sandstone (Seawater)'] = phi_sandstone_seawater
-                    
-                    phi_limestone_seawater = round(((sonic_log - dt_matrix_limestone) / (dt_fluid_seawater - dt_matrix_limestone)), 4)
-                    row_data['Limestone (Seawater)'] = phi_limestone_seawater
-                
-        
-                    phi_dolomite_seawater = round(((sonic_log - dt_matrix_dolomite) / (dt_fluid_seawater - dt_matrix_dolomite)), 4)
-                    row_data['Dolomite (Seawater)'] = phi_dolomite_seawater
-                
-        
-                    phi_sandstone_freshwater = round(((sonic_log - dt_matrix_sandstone) / (dt_fluid_freshwater - dt_matrix_sandstone)), 4)
-                    row_data['Sandstone (Freshwater)'] = phi_sandstone_freshwater
-                
-        
-                    phi_limestone_freshwater = round(((sonic_log - dt_matrix_limestone) / (dt_fluid_freshwater - dt_matrix_limestone)),4)
-                    row_data['Limestone (Freshwater)'] = phi_limestone_freshwater
-                
-                    phi_dolomite_freshwater = round(((sonic_log - dt_matrix_dolomite) / (dt_fluid_freshwater - dt_matrix_dolomite)), 4)
-                    row_data['Dolomite (Freshwater)'] = phi_dolomite_freshwater
-        
-            
-                    # Add similar conditions for other checkboxes (e.g., mode_limestone_freshwater, mode_dolomite_freshwater, etc.)
-                    data.append(row_data)
-                  
-        # Create the DataFrame with appropriate columns
-        las_df_revised = pd.DataFrame(data)
+            correction = correction_editor(las_df['DEPTH'], las_df[selected_curve])
+            zones = zonation_editor(las_df['DEPTH'])
+            zones_key = zones.key if zones is not None else None
+            porosity_inputs = (las_file.key, selected_curve, parameters.key)
+            porosity_result = graph.stage('porosity', porosity_inputs,
+                                          lambda: porosity.sweep(las_df['DEPTH'], las_df[selected_curve], parameters), shared=True)
+            las_df_revised = graph.stage('table', (porosity_inputs, correction, zones_key),
+                                         lambda: porosity_frame(porosity_result, correction, zones), shared=True)
     
     
     
         # Display the DataFrame as a presentable Excel-like table      
-        if data == [] or selected_curve == "DEPTH":
-            for depth in (las_df["DEPTH"]):
-                las_temporary = {"Depth": depth}
-                temporary.append(las_temporary)
-              
-            temp = pd.DataFrame(temporary)
+        if las_df_revised.empty or selected_curve == "DEPTH":
+            temp = pd.DataFrame({"Depth": las_df["DEPTH"].to_numpy()})
             with st.expander('Data Set:', expanded=False):
-                st.dataframe(temp)
+                paged_table(temp, 'depth_table')
         else:
             with st.expander('Data Set:', expanded=True):
         
-                st.dataframe(las_df_revised)
+                paged_table(las_df_revised, 'data_set_table')
             st.divider()
 
     except(UnboundLocalError):
@@ -149,207 +338,7 @@ def app():
         if selected_curve == "DEPTH":
             pass
         else:
-            st.markdown("### Data Visualization")
-            col1, col2 = st.columns(2)
-            mode_sandstone_seawater = col1.checkbox("Matrix: Sandstone | Fluid: Seawater")
-            mode_limestone_seawater = col1.checkbox("Matrix: Limestone | Fluid: Seawater")
-            mode_dolomite_seawater = col1.checkbox("Matrix: Dolomite | Fluid: Seawater")
-            mode_sandstone_freshwater = col2.checkbox("Matrix: Sandstone | Fluid: Freshwater") 
-            mode_limestone_freshwater = col2.checkbox("Matrix: Limestone | Fluid: Freshwater")
-            mode_dolomite_freshwater = col2.checkbox("Matrix: Dolomite | Fluid: Freshwater")
-            
-            count_parameters = 1    
-            if mode_sandstone_seawater:
-                count_parameters += 1       
-            if mode_limestone_seawater:
-                count_parameters += 1  
-            if mode_dolomite_seawater:
-                count_parameters += 1  
-            if mode_sandstone_freshwater:
-                count_parameters += 1  
-            if mode_limestone_freshwater:
-                count_parameters += 1  
-            if mode_dolomite_freshwater:
-                count_parameters += 1  
-    
-            def configure_track(fig, track_num, x_title, x_range, y_title):
-                fig.update_xaxes(
-                    title=x_title,
-                    ticks="inside",
-                    nticks=5,
-                    minor_ticks='inside',
-                    minor_showgrid=True,
-                    showline=True,
-                    anchor='free',
-                    position=1,
-                    autorange='reversed',
-                    rangemode='tozero',
-                    gridcolor='lightgray',
-                    gridwidth=2,
-                    side='top',
-                    range=x_range,
-                    row=1,
-                    col=track_num
-                )
-                fig.update_yaxes(
-                    ticks="inside",
-                    autorange='reversed',
-                    showline=True,
-                    gridcolor='lightgray',
-                    gridwidth=2,
-                    showticklabels=True,
-                    row=1,
-                    col=track_num
-                )
-            
-            trackname_1 = '''Sonic Log'''
-            trackname_2 = 'Sonic Porosity SS-SW Scale (p.u.)'
-            trackname_3 = 'Sonic Porosity LS-SW Scale (p.u.)'
-            trackname_4 = 'Sonic Porosity DL-SW Scale (p.u.)'
-            trackname_5 = 'Sonic Porosity SS-FW Scale (p.u.)'
-            trackname_6 = 'Sonic Porosity LS-SW Scale (p.u.)'
-            trackname_7 = 'Sonic Porosity DL-SW Scale (p.u.)'
-                  
-            # Initialize the figure with the appropriate number of columns
-            fig = make_subplots(rows=1, cols=count_parameters, shared_yaxes=True)
-            
-            # Counter for the current subplot column
-            current_col = 1
-            
-            # Track 1
-            curve_1 = go.Scatter(x=las_df_revised['Sonic Log'], y=las_df_revised['Depth'], name=trackname_1)
-            fig.add_trace(curve_1, row=1, col=current_col)
-            fig.update_xaxes(
-                title='Sonic Log',
-                ticks="inside",
-                nticks=5,
-                minor_ticks='inside',
-                minor_showgrid=True,
-                showline=True,
-                anchor='free',
-                position=1,
-                autorange='reversed',
-                rangemode='tozero',
-                gridcolor='lightgray',
-                gridwidth=2,
-                side='top',
-                range=[140, 40],
-                row=1,
-                col=1
-            )
-            fig.update_yaxes(
-                title='Depth',
-                ticks="inside",
-                autorange='reversed',
-                showline=True,
-                gridcolor='lightgray',
-                gridwidth=2,
-                showticklabels=True,
-                row=1,
-                col=1
-            )
-            
-            # Increment the counter
-            current_col += 1
-            
-            # Checkboxes for other parameters
-            # Add traces and configure tracks based on the checked parameters, adjusting the current_col accordingly
-            
-            if mode_sandstone_seawater:
-                curve_2 = go.Scatter(x=las_df_revised["Sandstone (Seawater)"], y=las_df_revised['Depth'], name=trackname_2)
-                fig.add_trace(curve_2, row=1, col=current_col)
-                configure_track(fig, current_col, 'Sandstone (Seawater)', [-0.15, 1.51], 'Depth')
-                current_col += 1
-            
-            if mode_limestone_seawater:
-                curve_3 = go.Scatter(x=las_df_revised["Limestone (Seawater)"], y=las_df_revised['Depth'], name=trackname_3)
-                fig.add_trace(curve_3, row=1, col=current_col)
-                configure_track(fig, current_col, 'Limestone (Seawater)', [-0.15, 1.51], 'Depth')
-                current_col += 1
-            
-            if mode_dolomite_seawater:
-                curve_4 = go.Scatter(x=las_df_revised["Dolomite (Seawater)"], y=las_df_revised['Depth'], name=trackname_4)
-                fig.add_trace(curve_4, row=1, col=current_col)
-                configure_track(fig, current_col, 'Dolomite (Seawater)', [-0.15, 1.51], 'Depth')
-                current_col += 1
-            
-            if mode_sandstone_freshwater:
-                curve_5 = go.Scatter(x=las_df_revised["Sandstone (Freshwater)"], y=las_df_revised['Depth'], name=trackname_5)
-                fig.add_trace(curve_5, row=1, col=current_col)
-                configure_track(fig, current_col, 'Sandstone (Freshwater)', [-0.15, 1.51], 'Depth')
-                current_col += 1
-            
-            if mode_limestone_freshwater:
-                curve_6 = go.Scatter(x=las_df_revised["Limestone (Freshwater)"], y=las_df_revised['Depth'], name=trackname_6)
-                fig.add_trace(curve_6, row=1, col=current_col)
-                configure_track(fig, current_col, 'Limestone (Freshwater)', [-0.15, 1.51], 'Depth')
-                current_col += 1
-            
-            if mode_dolomite_freshwater:
-                curve_7 = go.Scatter(x=las_df_revised["Dolomite (Freshwater)"], y=las_df_revised['Depth'], name=trackname_7)
-                fig.add_trace(curve_7, row=1, col=current_col)
-                configure_track(fig, current_col, 'Dolomite (Freshwater)', [-0.15, 1.51], 'Depth')
-                current_col += 1
-            
-            # Update layout and display the plot
-            fig.update_layout(
-                title=None,
-                height=1000,
-                width=2000
-            )
-            
-            # Update traces
-            for i in range(1, count_parameters + 1):
-                fig.update_traces(legendgroup=f'track{i}', row=1, col=i)
-            
-            st.markdown("### Log Plot")
-            if current_col == 2:
-                fig.update_layout(
-                    title=None,
-                    height=1000,
-                    width=350
-                )
-                st.plotly_chart(fig, use_container_width=False, theme=None)
-                
-            elif current_col == 3:
-                fig.update_layout(
-                    title=None,
-                    height=1000,
-                    width=700
-                )
-                st.plotly_chart(fig, use_container_width=False, scroll=True, theme=None)
-
-            elif current_col == 4:
-                fig.update_layout(
-                    title=None,
-                    height=1000,
-                    width=1050
-                )
-                st.plotly_chart(fig, use_container_width=False, scroll=True, theme=None)
-
-            elif current_col == 5:
-                fig.update_layout(
-                    title=None,
-                    height=1000,
-                    width=1400
-                )
-                st.plotly_chart(fig, use_container_width=False, scroll=True, theme=None)
-
-            elif current_col == 6:
-                fig.update_layout(
-                    title=None,
-                    height=1000,
-                    width=1750
-                )
-                st.plotly_chart(fig, use_container_width=False, scroll=True, theme=None)
-                
-            else:
-                fig.update_layout(
-                    title=None,
-                    height=1000,
-                    width=2100
-                )
-                st.plotly_chart(fig, use_container_width=False, scroll=True, theme=None)
+            data_visualization(las_df_revised, (las_file.key, selected_curve, parameters.key, correction, zones_key))
     
           
 
@@ -374,64 +363,55 @@ def app():
             
             def display_curve_data_overview():
                 st.subheader('Curve Data Overview')
-                st.markdown('''The value on the left figure is the number of rows. White space in each column of the curve is a missing value row/data. 
-                                Expand to see more details''')
-                st.pyplot(msno.matrix(las_df, sparkline=True, labels=100).figure)
+                st.markdown('''Black shows where each curve has data and white space is a missing value interval, 
+                                down the depth of the well. The table lists the coverage and the gap intervals of each curve.''')
+                null_coverage = coverage.null_coverage(las_file)
+                st.plotly_chart(null_coverage.figure(), use_container_width=True, theme=None)
+                st.dataframe(null_coverage.table, hide_index=True, use_container_width=True)
                 
-            def filter_depth(las_df_revised, start_depth, stop_depth):
+            def build_depth_index(max_gap):
+                # Gap-filled porosity and its prefix-sum index
+                filled = interpolation.filled_porosity(las_file, selected_curve, max_gap)
+                result = interpolation.filled_sweep(las_file, selected_curve, max_gap, parameters)
+                porosity_columns = result.porosity_columns
+                return result.to_frame(), evaluation.DepthIndex(
+                    result.depth, np.column_stack([result.column(c) for c in porosity_columns]), porosity_columns), filled.filled_count
+            
+            def build_derived_index(interpolated_well_df):
+                # Changing Cp, Hy or the zones only rescales or re-maps the cached porosity and indexes the new columns
+                result = interpolation.filled_sweep(las_file, selected_curve, max_gap, parameters)
+                data = derived_columns(result, correction, zones)
+                values = np.column_stack(list(data.values()))
+                return (pd.concat([interpolated_well_df, pd.DataFrame(data)], axis=1),
+                        evaluation.DepthIndex(result.depth, values, list(data)))
+            
+            def filter_depth(interpolated_well_df, depth_index, start_depth, stop_depth):
                 top_depth = col1.number_input('Top Depth', min_value=0.00, value=start_depth, step=100.00, key="top_depth")
                 bot_depth = col2.number_input('Bottom Depth', min_value=0.00, value=stop_depth, step=100.00, key="bot_depth")
                 
                 if col1.button('Evaluate'):
-                    depth_filtered_df = las_df_revised[
-                        (las_df_revised['Depth'] >= top_depth) & (las_df_revised['Depth'] <= bot_depth)]
+                    window = (top_depth, bot_depth)
+                    depth_filtered_df = graph.stage('window', (derived_inputs, window),
+                                                    lambda: interpolated_well_df.iloc[np.sort(depth_index.rows(*window))], shared=True)
     
                 else:   
-                    depth_filtered_df = las_df_revised
+                    window = (None, None)
+                    depth_filtered_df = interpolated_well_df
                     
     
-                return depth_filtered_df, top_depth, bot_depth
-            
-            def interpolate_data(depth_filtered_df):
-                
-                # Perform linear interpolation without extrapolation
-                interpolated_df = depth_filtered_df.apply(lambda col: col.interpolate(method='linear', limit_area='inside'))
-                
-                return interpolated_df
+                return depth_filtered_df, window, top_depth, bot_depth
             
-            def categorize_porosity(column):
-                negative_val = 0
-                normal_val = 0
-                abnormal_val = 0
-                null_val = 0
-                null_val = interpolated_df[column].isnull().sum()
-                total_val = len(interpolated_df[column])
-            
-                for data in interpolated_df[column]:
-                    if data < 0:
-                        negative_val += 1
-                    if 0 <= data <= 1:
-                        normal_val += 1
-                    if data > 1:
-                        abnormal_val += 1
-                
-                return negative_val, normal_val, abnormal_val, null_val, total_val
-            
-            def interpretation(negative_val, normal_val, abnormal_val, null_val, total_val):
+            def interpretation(row):
     # Porosity Distribution
-                normal_percentage = (normal_val/total_val)*100
-                negative_percentage = (negative_val/total_val)*100
-                abnormal_percentage = (abnormal_val/total_val)*100
-                null_percentage = (null_val/total_val)*100
+                normal_percentage = row['Normal %']
+                negative_percentage = row['Negative %']
+                abnormal_percentage = row['Abnormal %']
+                null_percentage = row['Null %']
     
     # Weighted Average Porosity            
-                sum_thickness_porosity = 0
-                
-                for value in interpolated_df[column]:
-                    thickness_porosity = (1 * value)
-                    sum_thickness_porosity += thickness_porosity
-                weighted_average_porosity = sum_thickness_porosity / (1 * len(depth_filtered_df[column]))
-                rounded_average_porosity = round(weighted_average_porosity, 4)
+                matrix = row['Matrix']
+                fluid = row['Fluid']
+                rounded_average_porosity = row['Weighted average porosity']
     
                 st.markdown('''
                             =======================================================
@@ -486,13 +466,13 @@ def app():
                     
     
             try:
-              well_name =  las_file.header['Well'].WELL.value
+              well_name =  las_file.header['Well']['WELL'].value
               start_depth = las_df['DEPTH'].min()
               stop_depth = las_df['DEPTH'].max()
               step = abs(las_df['DEPTH'][1]-las_df['DEPTH'][0])
-              company_name =  las_file.header['Well'].COMP.value
-              date =  las_file.header['Well'].DATE.value
-              curvename = las_file.curves
+              company_name =  las_file.header['Well']['COMP'].value
+              date =  las_file.header['Well']['DATE'].value
+              curvename = las_file.curves_text()
             except:
               well_name =  'unknown'
               start_depth = 0.00
@@ -500,11 +480,20 @@ def app():
               step = abs(las_df['DEPTH'][1]-las_df['DEPTH'][0])
               company_name =  'unknown'
               date =  'unknown'
-              curvename = las_file.curves
+              curvename = las_file.curves_text()
     
+            max_gap = st.number_input('Longest sonic gap to interpolate (0 = any)', min_value=0.00, value=0.00, step=10.00, key="max_gap")
+            index_inputs = (las_file.key, selected_curve, max_gap, parameters.key)
+            interpolated_well_df, depth_index, filled_count = graph.stage('interpolate', index_inputs, lambda: build_depth_index(max_gap), shared=True)
+            derived_inputs = (index_inputs, correction, zones_key)
+            depth_indexes = [depth_index]
+            if correction is not None or zones is not None:
+                interpolated_well_df, derived_index = graph.stage('derive', derived_inputs,
+                                                                  lambda: build_derived_index(interpolated_well_df), shared=True)
+                depth_indexes.append(derived_index)
+            st.caption(f'{filled_count} missing sonic samples filled by interpolation.')
             col1, col2 = st.columns(2)
-            depth_filtered_df, top_depth, bot_depth = filter_depth(las_df_revised, start_depth, stop_depth)  
-            interpolated_df = interpolate_data(depth_filtered_df)
+            interpolated_df, window, top_depth, bot_depth = filter_depth(interpolated_well_df, depth_index, start_depth, stop_depth)
             
     
             with st.expander("**Findings:**", expanded = False):
@@ -519,252 +508,36 @@ def app():
                 
                 st.divider()
                 st.subheader('Evaluated Data')
-                st.dataframe(interpolated_df)
+                paged_table(interpolated_df, 'evaluated_table')
                 
                 st.divider()
                 st.markdown(f'''
                             **At depth of {top_depth} up to {bot_depth}**
                             ''')
                             
-                matrix = "Sandstone"
-                fluid = "Seawater"
-                column = 'Sandstone (Seawater)'
-                negative_val, normal_val, abnormal_val, null_val, total_val = categorize_porosity(column)
-                interpretation(negative_val, normal_val, abnormal_val, null_val, total_val)
-                
-                matrix = "Limestone"
-                fluid = "Seawater"
-                column = 'Limestone (Seawater)'
-                negative_val, normal_val, abnormal_val, null_val, total_val = categorize_porosity(column)
-                interpretation(negative_val, normal_val, abnormal_val, null_val, total_val)
-                
-                matrix = "Dolomite"
-                fluid = "Seawater"
-                column = 'Dolomite (Seawater)'
-                negative_val, normal_val, abnormal_val, null_val, total_val = categorize_porosity(column)
-                interpretation(negative_val, normal_val, abnormal_val, null_val, total_val)
+                # Porosity distribution and weighted average for all columns from the prefix sums
+                porosity_stats = graph.stage('stats', (derived_inputs, window),
+                                             lambda: pd.concat([index.statistics(*window) for index in depth_indexes], ignore_index=True), shared=True)
+                st.dataframe(porosity_stats, hide_index=True)
                 
-                matrix = "Sandstone"
-                fluid = "Freshwater"
-                column = 'Sandstone (Freshwater)'
-                negative_val, normal_val, abnormal_val, null_val, total_val = categorize_porosity(column)
-                interpretation(negative_val, normal_val, abnormal_val, null_val, total_val)
-                
-                matrix = "Limestone"
-                fluid = "Freshwater"
-                column = 'Limestone (Freshwater)'
-                negative_val, normal_val, abnormal_val, null_val, total_val = categorize_porosity(column)
-                interpretation(negative_val, normal_val, abnormal_val, null_val, total_val)
-                
-                matrix = "Dolomite"
-                fluid = "Freshwater"
-                column = 'Dolomite (Freshwater)'
-                negative_val, normal_val, abnormal_val, null_val, total_val = categorize_porosity(column)
-                interpretation(negative_val, normal_val, abnormal_val, null_val, total_val)
+                if not (porosity_stats['Total'] > 0).any():
+                    st.info('No samples in window.')
+                else:
+                    for _, row in porosity_stats.iterrows():
+                        interpretation(row)
         
 
-            st.markdown("### Data Visualization")
-            col1, col2 = st.columns(2)
-            mode_sandstone_seawater = col1.checkbox("Matrix: Sandstone | Fluid: Seawater")
-            mode_limestone_seawater = col1.checkbox("Matrix: Limestone | Fluid: Seawater")
-            mode_dolomite_seawater = col1.checkbox("Matrix: Dolomite | Fluid: Seawater")
-            mode_sandstone_freshwater = col2.checkbox("Matrix: Sandstone | Fluid: Freshwater") 
-            mode_limestone_freshwater = col2.checkbox("Matrix: Limestone | Fluid: Freshwater")
-            mode_dolomite_freshwater = col2.checkbox("Matrix: Dolomite | Fluid: Freshwater")
-            
-            count_parameters = 1    
-            if mode_sandstone_seawater:
-                count_parameters += 1       
-            if mode_limestone_seawater:
-                count_parameters += 1  
-            if mode_dolomite_seawater:
-                count_parameters += 1  
-            if mode_sandstone_freshwater:
-                count_parameters += 1  
-            if mode_limestone_freshwater:
-                count_parameters += 1  
-            if mode_dolomite_freshwater:
-                count_parameters += 1  
-    
-            def configure_track(fig, track_num, x_title, x_range, y_title):
-                fig.update_xaxes(
-                    title=x_title,
-                    ticks="inside",
-                    nticks=5,
-                    minor_ticks='inside',
-                    minor_showgrid=True,
-                    showline=True,
-                    anchor='free',
-                    position=1,
-                    autorange='reversed',
-                    rangemode='tozero',
-                    gridcolor='lightgray',
-                    gridwidth=2,
-                    side='top',
-                    range=x_range,
-                    row=1,
-                    col=track_num
-                )
-                fig.update_yaxes(
-                    ticks="inside",
-                    autorange='reversed',
-                    showline=True,
-                    gridcolor='lightgray',
-                    gridwidth=2,
-                    showticklabels=True,
-                    row=1,
-                    col=track_num
-                )
-            
-            trackname_1 = '''Sonic Log'''
-            trackname_2 = 'Sonic Porosity SS-SW Scale (p.u.)'
-            trackname_3 = 'Sonic Porosity LS-SW Scale (p.u.)'
-            trackname_4 = 'Sonic Porosity DL-SW Scale (p.u.)'
-            trackname_5 = 'Sonic Porosity SS-FW Scale (p.u.)'
-            trackname_6 = 'Sonic Porosity LS-SW Scale (p.u.)'
-            trackname_7 = 'Sonic Porosity DL-SW Scale (p.u.)'
-                  
-            # Initialize the figure with the appropriate number of columns
-            fig = make_subplots(rows=1, cols=count_parameters, shared_yaxes=True)
-            
-            # Counter for the current subplot column
-            current_col = 1
-            
-            # Track 1
-            curve_1 = go.Scatter(x=interpolated_df['Sonic Log'], y=interpolated_df['Depth'], name=trackname_1)
-            fig.add_trace(curve_1, row=1, col=current_col)
-            fig.update_xaxes(
-                title='Sonic Log',
-                ticks="inside",
-                nticks=5,
-                minor_ticks='inside',
-                minor_showgrid=True,
-                showline=True,
-                anchor='free',
-                position=1,
-                autorange='reversed',
-                rangemode='tozero',
-                gridcolor='lightgray',
-                gridwidth=2,
-                side='top',
-                range=[140, 40],
-                row=1,
-                col=1
-            )
-            fig.update_yaxes(
-                title='Depth',
-                ticks="inside",
-                autorange='reversed',
-                showline=True,
-                gridcolor='lightgray',
-                gridwidth=2,
-                showticklabels=True,
-                row=1,
-                col=1
-            )
-            
-            # Increment the counter
-            current_col += 1
-            
-            # Checkboxes for other parameters
-            # Add traces and configure tracks based on the checked parameters, adjusting the current_col accordingly
-            
-            if mode_sandstone_seawater:
-                curve_2 = go.Scatter(x=interpolated_df["Sandstone (Seawater)"], y=interpolated_df['Depth'], name=trackname_2)
-                fig.add_trace(curve_2, row=1, col=current_col)
-                configure_track(fig, current_col, 'Sandstone (Seawater)', [-0.15, 1.51], 'Depth')
-                current_col += 1
-            
-            if mode_limestone_seawater:
-                curve_3 = go.Scatter(x=interpolated_df["Limestone (Seawater)"], y=interpolated_df['Depth'], name=trackname_3)
-                fig.add_trace(curve_3, row=1, col=current_col)
-                configure_track(fig, current_col, 'Limestone (Seawater)', [-0.15, 1.51], 'Depth')
-                current_col += 1
-            
-            if mode_dolomite_seawater:
-                curve_4 = go.Scatter(x=interpolated_df["Dolomite (Seawater)"], y=interpolated_df['Depth'], name=trackname_4)
-                fig.add_trace(curve_4, row=1, col=current_col)
-                configure_track(fig, current_col, 'Dolomite (Seawater)', [-0.15, 1.51], 'Depth')
-                current_col += 1
-            
-            if mode_sandstone_freshwater:
-                curve_5 = go.Scatter(x=interpolated_df["Sandstone (Freshwater)"], y=interpolated_df['Depth'], name=trackname_5)
-                fig.add_trace(curve_5, row=1, col=current_col)
-                configure_track(fig, current_col, 'Sandstone (Freshwater)', [-0.15, 1.51], 'Depth')
-                current_col += 1
-            
-            if mode_limestone_freshwater:
-                curve_6 = go.Scatter(x=interpolated_df["Limestone (Freshwater)"], y=interpolated_df['Depth'], name=trackname_6)
-                fig.add_trace(curve_6, row=1, col=current_col)
-                configure_track(fig, current_col, 'Limestone (Freshwater)', [-0.15, 1.51], 'Depth')
-                current_col += 1
-            
-            if mode_dolomite_freshwater:
-                curve_7 = go.Scatter(x=interpolated_df["Dolomite (Freshwater)"], y=interpolated_df['Depth'], name=trackname_7)
-                fig.add_trace(curve_7, row=1, col=current_col)
-                configure_track(fig, current_col, 'Dolomite (Freshwater)', [-0.15, 1.51], 'Depth')
-                current_col += 1
-            
-            # Update layout and display the plot
-            fig.update_layout(
-                title=None,
-                height=1000,
-                width=2000
-            )
-            
-            # Update traces
-            for i in range(1, count_parameters + 1):
-                fig.update_traces(legendgroup=f'track{i}', row=1, col=i)
-            
-            st.markdown("### Log Plot")
-            if current_col == 2:
-                fig.update_layout(
-                    title=None,
-                    height=1000,
-                    width=350
-                )
-                st.plotly_chart(fig, use_container_width=False, theme=None)
-                
-            elif current_col == 3:
-                fig.update_layout(
-                    title=None,
-                    height=1000,
-                    width=700
-                )
-                st.plotly_chart(fig, use_container_width=False, scroll=True, theme=None)
-    
-            elif current_col == 4:
-                fig.update_layout(
-                    title=None,
-                    height=1000,
-                    width=1050
-                )
-                st.plotly_chart(fig, use_container_width=False, scroll=True, theme=None)
-    
-            elif current_col == 5:
-                fig.update_layout(
-                    title=None,
-                    height=1000,
-                    width=1400
-                )
-                st.plotly_chart(fig, use_container_width=False, scroll=True, theme=None)
-    
-            elif current_col == 6:
-                fig.update_layout(
-                    title=None,
-                    height=1000,
-                    width=1750
-                )
-                st.plotly_chart(fig, use_container_width=False, scroll=True, theme=None)
-                
-            else:
-                fig.update_layout(
-                    title=None,
-                    height=1000,
-                    width=2100
-                )
-                st.plotly_chart(fig, use_container_width=False, scroll=True, theme=None)
+            data_visualization(interpolated_df, (las_file.key, selected_curve, max_gap, parameters.key, correction, zones_key, window))
         
     except (KeyError):
         pass
+    
+    with st.sidebar.expander('**Computation stages (last rerun)**', expanded=False):
+        st.dataframe(graph.report(), hide_index=True)
+    
+    with st.sidebar.expander('**Shared cache**', expanded=False):
+        # Process-wide: wells and derived arrays are shared by every session on this server
+        cache = shared_cache.shared
+        st.caption(f'{cache.total / 2 ** 20:.1f} of {cache.budget / 2 ** 20:.0f} MB used by {len(cache)} entries')
+        st.dataframe(cache.stats(), hide_index=True)
         
@@ -1,6 +1,6 @@
+import importlib
 import streamlit as st
 from streamlit_option_menu import option_menu
-import Home, About, Guide, Info, Interpretation
 
 
 
@@ -13,33 +13,31 @@ st.set_page_config(
 class MultiApp:
 
     def __init__(self):
-        self.apps = []
+        self.apps = {}
 
-    def add_app(self, title, function):
-        self.apps.append({
-            "title": title,
-            "function": function
-        })
+    def add_app(self, title, module_name):
+        # Page modules (and their heavy imports) load the first time they are selected
+        self.apps[title] = module_name
 
     def run(self, main_menu):
-        for app in self.apps:   
-            if main_menu == app["title"]:
-                app["function"]()
+        module_name = self.apps.get(main_menu)
+        if module_name is not None:
+            importlib.import_module(module_name).app()
 
 # Create an instance of MultiApp
 multi_app = MultiApp()
 
 # Add your apps to the MultiApp instance
-multi_app.add_app("Home", Home.app)
-multi_app.add_app("About", About.app)
-multi_app.add_app("User's Guide", Guide.app)
-multi_app.add_app("Additional Info", Info.app)
-multi_app.add_app("Interpretation", Interpretation.app)
+multi_app.add_app("Home", "Home")
+multi_app.add_app("About", "About")
+multi_app.add_app("User's Guide", "Guide")
+multi_app.add_app("Additional Info", "Info")
+multi_app.add_app("Interpretation", "Interpretation")
 
 
 main_menu = option_menu(
     None,
-    options=["Home", "About", "User's Guide", "Additional Info", "Interpretation"],
+    options=list(multi_app.apps),
     icons=["house", "patch-question", "journal-bookmark", "lightbulb", "calculator"],
     default_index=0,
     orientation="horizontal",
@@ -0,0 +1,67 @@
+import io
+import os
+import threading
+
+from PIL import Image, features
+
+
+ASSET_CACHE_DIR = os.environ.get('SONIC_ASSET_CACHE_DIR', '.asset_cache')
+FORMAT = 'WEBP' if features.check('webp') else 'PNG'
+QUALITY = 80
+
+cache = {}
+cache_lock = threading.Lock()
+
+
+def variant_name(path, mtime_ns, width_scale, height_scale, max_width):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f'{stem}-{width_scale:g}x{height_scale:g}-w{max_width or 0}-{mtime_ns}.{FORMAT.lower()}'
+
+
+def build_variant(path, width_scale=1.0, height_scale=1.0, max_width=None):
+    with Image.open(path) as img:
+        width, height = int(img.width / width_scale), int(img.height / height_scale)
+        if max_width and width > max_width:
+            height, width = int(height * max_width / width), max_width
+        img = img.convert('RGBA') if img.mode not in ('RGB', 'RGBA') else img
+        if (width, height) != img.size:
+            img = img.resize((width, height), Image.LANCZOS)
+        buffer = io.BytesIO()
+        if FORMAT == 'WEBP':
+            img.save(buffer, FORMAT, quality=QUALITY, method=4)
+        else:
+            img.save(buffer, FORMAT, optimize=True)
+    return buffer.getvalue()
+
+
+def image(path, width_scale=1.0, height_scale=1.0, max_width=None):
+    '''Encoded bytes of a resized, compressed variant of the image at path, ready for st.image.
+
+    Variants are built once per file modification time, kept in a process-wide
+    cache and written to ASSET_CACHE_DIR so new processes skip the resize too.
+    '''
+    mtime_ns = os.stat(path).st_mtime_ns
+    key = (os.path.abspath(path), mtime_ns, width_scale, height_scale, max_width)
+    with cache_lock:
+        data = cache.get(key)
+    if data is not None:
+        return data
+
+    disk_path = os.path.join(ASSET_CACHE_DIR, variant_name(path, mtime_ns, width_scale, height_scale, max_width))
+    try:
+        with open(disk_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        data = build_variant(path, width_scale, height_scale, max_width)
+        try:
+            os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+            tmp_path = f'{disk_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, disk_path)
+        except OSError:
+            pass
+
+    with cache_lock:
+        cache[key] = data
+    return data
@@ -0,0 +1,117 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import evaluation
+import las_cache
+import las_stream
+import sonic_curves
+
+
+def header_curves(source):
+    # ~Curve block only: the ~A data section is never read
+    if isinstance(source, str):
+        with open(source, encoding='utf-8', errors='replace') as f:
+            return las_stream.read_header(f)[1]
+    return las_stream.read_header(las_stream.text_buffer(source[1]))[1]
+
+
+def resolve_sonic_curve(source, sonic_curve=None):
+    return sonic_curves.SonicCurveIndex(header_curves(source)).resolve(sonic_curve)
+
+
+def resolve_sources(sources, sonic_curve=None):
+    '''Sonic curve chosen for every source, from the headers alone (None where there is none).'''
+    resolved = []
+    for source in sources:
+        name = source if isinstance(source, str) else source[0]
+        try:
+            index = sonic_curves.SonicCurveIndex(header_curves(source))
+            curve, candidates = index.resolve(sonic_curve), ', '.join(index.ranked())
+        except (OSError, ValueError) as error:
+            curve, candidates = None, f'{type(error).__name__}: {error}'
+        resolved.append({'Source': os.path.basename(name), 'Sonic curve': curve, 'Candidates': candidates})
+    return pd.DataFrame(resolved)
+
+
+def list_las_files(directory):
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith('.las'))
+
+
+def evaluate_source(source, sonic_curve=None, top=None, bottom=None, loader=None, max_gap=None, parameters=None, zones=None):
+    '''Worker: load and evaluate one well. source is a path or a (name, bytes) upload.
+
+    loader, if given, must be a module-level function taking a path and the
+    list of curves to read.
+    '''
+    start = time.perf_counter()
+    name = source if isinstance(source, str) else source[0]
+    summary = {'Source': os.path.basename(name), 'Well': None, 'Sonic curve': None, 'Rows': 0, 'Error': None}
+    stats = None
+    try:
+        # Wells without a sonic curve are rejected before their data is parsed
+        curve = resolve_sonic_curve(source, sonic_curve)
+        if curve is None:
+            raise KeyError('no sonic curve found')
+        summary['Sonic curve'] = curve
+        if isinstance(source, str):
+            well = loader(source, [curve]) if loader else las_cache.load_las_path(source)
+        else:
+            well = las_cache.load_las_bytes(source[1])
+        summary['Well'] = well.header['Well']['WELL'].value if 'WELL' in well.header['Well'] else None
+        summary['Rows'] = len(well.index)
+        stats = evaluation.evaluate_well(well, curve, top, bottom, max_gap, parameters, zones)
+    except Exception as error:  # one bad file must not stop the batch
+        summary['Error'] = f'{type(error).__name__}: {error}'
+    summary['Seconds'] = time.perf_counter() - start
+    return summary, stats
+
+
+class BatchResult:
+    '''Per-well summaries and statistics tables (None where a well failed), in input order.'''
+
+    def __init__(self, summaries, stats, elapsed, workers):
+        self.summaries = summaries
+        self.stats = stats
+        self.elapsed = elapsed
+        self.workers = workers
+
+    def overview(self):
+        return pd.DataFrame(self.summaries)
+
+    @property
+    def rows(self):
+        return sum(summary['Rows'] for summary in self.summaries)
+
+    def throughput(self):
+        elapsed = self.elapsed or float('nan')
+        return {
+            'Wells': len(self.summaries),
+            'Rows': self.rows,
+            'Workers': self.workers,
+            'Seconds': self.elapsed,
+            'Wells/sec': len(self.summaries) / elapsed,
+            'Rows/sec': self.rows / elapsed,
+        }
+
+
+def run_batch(sources, sonic_curve=None, top=None, bottom=None, max_workers=None, loader=None, max_gap=None, parameters=None, zones=None):
+    '''Evaluate many wells in a process pool; one statistics table per well.'''
+    sources = list(sources)
+    workers = max_workers or min(len(sources), os.cpu_count() or 1) or 1
+    start = time.perf_counter()
+    if workers == 1:
+        results = [evaluate_source(source, sonic_curve, top, bottom, loader, max_gap, parameters, zones) for source in sources]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(evaluate_source, source, sonic_curve, top, bottom, loader, max_gap, parameters, zones) for source in sources]
+            results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    summaries = [summary for summary, _ in results]
+    stats = [table for _, table in results]
+    return BatchResult(summaries, stats, elapsed, workers)
@@ -0,0 +1,67 @@
+'''Benchmark the vectorized porosity engine against the former per-row loop.
+
+Usage: python bench_porosity.py [LAS file] [sonic curve] [repeat]
+'''
+import sys
+import time
+
+import lasio
+import numpy as np
+import pandas as pd
+
+import porosity
+
+
+def legacy_loop(las_df, selected_curve):
+    # Per-row implementation previously used in Interpretation.app
+    dt_matrix_sandstone = 55.5
+    dt_matrix_limestone = 47.5
+    dt_matrix_dolomite = 43.5
+    dt_fluid_seawater = 185
+    dt_fluid_freshwater = 189
+
+    data = []
+    for depth, sonic_log in zip(las_df['DEPTH'], las_df[selected_curve]):
+        row_data = {"Depth": depth, 'Sonic Log': sonic_log}
+        if sonic_log is not None:
+            row_data['Sandstone (Seawater)'] = round(((sonic_log - dt_matrix_sandstone) / (dt_fluid_seawater - dt_matrix_sandstone)), 4)
+            row_data['Limestone (Seawater)'] = round(((sonic_log - dt_matrix_limestone) / (dt_fluid_seawater - dt_matrix_limestone)), 4)
+            row_data['Dolomite (Seawater)'] = round(((sonic_log - dt_matrix_dolomite) / (dt_fluid_seawater - dt_matrix_dolomite)), 4)
+            row_data['Sandstone (Freshwater)'] = round(((sonic_log - dt_matrix_sandstone) / (dt_fluid_freshwater - dt_matrix_sandstone)), 4)
+            row_data['Limestone (Freshwater)'] = round(((sonic_log - dt_matrix_limestone) / (dt_fluid_freshwater - dt_matrix_limestone)), 4)
+            row_data['Dolomite (Freshwater)'] = round(((sonic_log - dt_matrix_dolomite) / (dt_fluid_freshwater - dt_matrix_dolomite)), 4)
+            data.append(row_data)
+    return pd.DataFrame(data)
+
+
+def vectorized(las_df, selected_curve):
+    return porosity.compute_porosity(las_df['DEPTH'], las_df[selected_curve]).to_frame()
+
+
+def best_of(func, repeat, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(path='Sample.las', selected_curve='DT', repeat=5):
+    las_df = lasio.read(path).df()
+    las_df.insert(0, 'DEPTH', las_df.index)
+    las_df.reset_index(drop=True, inplace=True)
+
+    for factor in (1, 10):
+        frame = pd.concat([las_df] * factor, ignore_index=True)
+        legacy_time, legacy = best_of(legacy_loop, repeat, frame, selected_curve)
+        vector_time, vector = best_of(vectorized, repeat, frame, selected_curve)
+
+        assert np.allclose(legacy.to_numpy(dtype=np.float64), vector.to_numpy(), equal_nan=True)
+        print(f'{len(frame):>8} rows | loop {legacy_time * 1000:9.2f} ms | '
+              f'vectorized {vector_time * 1000:7.2f} ms | speedup {legacy_time / vector_time:6.1f}x')
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(*args[:2], *[int(a) for a in args[2:3]])
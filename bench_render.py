@@ -0,0 +1,62 @@
+'''Compare SVG (Scatter) and WebGL (Scattergl) log plots.
+
+Prints the serialized figure size and server-side build time for each mode,
+with and without decimation, and writes one HTML page per case that reports
+the client render time (Plotly.newPlot until the first 'plotly_afterplot')
+when opened in a browser.
+
+Usage: python bench_render.py [LAS file] [sonic curve] [output directory]
+
+The pages go to a new temporary directory unless one is given.
+'''
+import os
+import sys
+import tempfile
+import time
+
+import las_cache
+import log_plot
+import porosity
+
+
+HTML_TEMPLATE = '''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><script src="https://cdn.plot.ly/plotly-2.12.1.min.js"></script></head>
+<body><pre id="timing">rendering...</pre><div id="plot"></div>
+<script>
+var figure = {figure};
+var start = performance.now();
+Plotly.newPlot('plot', figure.data, figure.layout).then(function () {{
+  var elapsed = performance.now() - start;
+  document.getElementById('timing').textContent = '{label}: ' + elapsed.toFixed(1) + ' ms client render';
+  console.log('{label}', elapsed);
+}});
+</script></body></html>
+'''
+
+
+def main(path='Sample.las', selected_curve='DT', output_dir=None):
+    well = las_cache.load_las_path(path)
+    frame = porosity.compute_porosity(well.index, well.data[selected_curve]).to_frame()
+    tracks = [('Sonic Log', log_plot.SONIC_RANGE)]
+    tracks += [(column, log_plot.POROSITY_RANGE) for column in frame.columns if column not in ('Depth', 'Sonic Log')]
+    if output_dir is None:
+        output_dir = tempfile.mkdtemp(prefix='render_bench_')
+    os.makedirs(output_dir, exist_ok=True)
+
+    for decimated in (False, True):
+        for mode in ('SVG', 'WebGL'):
+            start = time.perf_counter()
+            fig = log_plot.build_log_figure(frame, tracks, render_mode=mode, decimated=decimated)
+            spec = fig.to_json()
+            elapsed = time.perf_counter() - start
+
+            label = f"{mode}{' decimated' if decimated else ''}"
+            html_path = os.path.join(output_dir, label.replace(' ', '_') + '.html')
+            with open(html_path, 'w') as f:
+                f.write(HTML_TEMPLATE.format(figure=spec, label=label))
+            print(f'{label:<16} | {log_plot.figure_points(fig):>7} points | {len(spec) / 1024:8.1f} KiB JSON | '
+                  f'build + serialize {elapsed * 1000:7.1f} ms | {html_path}')
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:4])
@@ -0,0 +1,179 @@
+'''Header-only catalog of LAS files in a local SQLite index.
+
+Only the ~Version, ~Well and ~Curve sections are read (las_stream.read_header
+stops at ~A); files are re-read only when their mtime or size changes.
+
+Usage: python catalog.py [--db PATH] DIRECTORY_OR_FILE [...]
+'''
+import os
+import sqlite3
+import sys
+import time
+
+import pandas as pd
+
+import las_stream
+import sonic_curves
+
+
+CATALOG_PATH = os.environ.get('SONIC_CATALOG', 'las_catalog.sqlite')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS wells (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    well TEXT,
+    company TEXT,
+    strt REAL,
+    stop REAL,
+    step REAL,
+    null_value REAL,
+    depth_unit TEXT,
+    sonic_curve TEXT,
+    indexed_at REAL
+);
+CREATE TABLE IF NOT EXISTS curves (
+    path TEXT NOT NULL REFERENCES wells(path) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    mnemonic TEXT NOT NULL,
+    unit TEXT,
+    descr TEXT,
+    PRIMARY KEY (path, position)
+);
+CREATE INDEX IF NOT EXISTS curves_mnemonic ON curves (mnemonic COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS wells_depth ON wells (strt, stop);
+'''
+
+
+def connect(db_path=CATALOG_PATH):
+    connection = sqlite3.connect(db_path)
+    connection.execute('PRAGMA foreign_keys = ON')
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def header_value(header, mnemonic):
+    item = header['Well'].get(mnemonic)
+    return None if item is None or item.value == '' else item.value
+
+
+def read_entry(path):
+    '''(well row, curve rows) for one LAS file, from its header sections only.'''
+    stat = os.stat(path)
+    with open(path, encoding='utf-8', errors='replace') as f:
+        header, curves, _ = las_stream.read_header(f)
+    strt = header['Well'].get('STRT')
+    well = (
+        path, stat.st_mtime_ns, stat.st_size,
+        None if header_value(header, 'WELL') is None else str(header_value(header, 'WELL')),
+        None if header_value(header, 'COMP') is None else str(header_value(header, 'COMP')),
+        number(header_value(header, 'STRT')), number(header_value(header, 'STOP')),
+        number(header_value(header, 'STEP')), number(header_value(header, 'NULL')),
+        strt.unit if strt is not None else None,
+        sonic_curves.SonicCurveIndex(curves).best if curves else None,
+        time.time(),
+    )
+    rows = [(path, position, item.mnemonic, item.unit, item.descr) for position, item in enumerate(curves.values())]
+    return well, rows
+
+
+def las_files(root):
+    if os.path.isfile(root):
+        return [os.path.abspath(root)]
+    found = []
+    for directory, _, names in os.walk(root):
+        found += [os.path.abspath(os.path.join(directory, name)) for name in names if name.lower().endswith('.las')]
+    return sorted(found)
+
+
+def update(roots, db_path=CATALOG_PATH):
+    '''Index every LAS file under roots; unchanged files (same mtime and size) are skipped.
+
+    Entries under a directory root whose file is gone are removed. Returns
+    counts of added, updated, unchanged, removed and failed files.
+    '''
+    counts = dict.fromkeys(('added', 'updated', 'unchanged', 'removed', 'failed'), 0)
+    connection = connect(db_path)
+    try:
+        with connection:
+            known = {path: (mtime_ns, size) for path, mtime_ns, size in connection.execute('SELECT path, mtime_ns, size FROM wells')}
+            seen = set()
+            for root in roots:
+                for path in las_files(root):
+                    seen.add(path)
+                    try:
+                        stat = os.stat(path)
+                        if known.get(path) == (stat.st_mtime_ns, stat.st_size):
+                            counts['unchanged'] += 1
+                            continue
+                        well, rows = read_entry(path)
+                    except (OSError, ValueError):
+                        counts['failed'] += 1
+                        continue
+                    connection.execute('DELETE FROM curves WHERE path = ?', (path,))
+                    connection.execute('INSERT OR REPLACE INTO wells VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', well)
+                    connection.executemany('INSERT INTO curves VALUES (?, ?, ?, ?, ?)', rows)
+                    counts['updated' if path in known else 'added'] += 1
+                if os.path.isdir(root):
+                    prefix = os.path.join(os.path.abspath(root), '')
+                    gone = [(path,) for path in known if path.startswith(prefix) and path not in seen]
+                    connection.executemany('DELETE FROM curves WHERE path = ?', gone)
+                    connection.executemany('DELETE FROM wells WHERE path = ?', gone)
+                    counts['removed'] += len(gone)
+    finally:
+        connection.close()
+    return counts
+
+
+def search(db_path=CATALOG_PATH, text=None, mnemonic=None, top=None, bottom=None, sonic_only=False, limit=500):
+    '''Wells matching every given filter, as a DataFrame.
+
+    text matches the well name, company or path; mnemonic a curve (case-insensitive);
+    top / bottom keep wells whose STRT-STOP range overlaps the interval.
+    '''
+    clauses, params = [], []
+    if text:
+        clauses.append('(w.well LIKE ? OR w.company LIKE ? OR w.path LIKE ?)')
+        params += [f'%{text}%'] * 3
+    if mnemonic:
+        clauses.append('EXISTS (SELECT 1 FROM curves c WHERE c.path = w.path AND c.mnemonic = ? COLLATE NOCASE)')
+        params.append(mnemonic)
+    if top is not None:
+        clauses.append('MAX(w.strt, w.stop) >= ?')
+        params.append(top)
+    if bottom is not None:
+        clauses.append('MIN(w.strt, w.stop) <= ?')
+        params.append(bottom)
+    if sonic_only:
+        clauses.append('w.sonic_curve IS NOT NULL')
+    query = ('SELECT w.well AS Well, w.company AS Company, w.strt AS Start, w.stop AS Stop, w.step AS Step, '
+             'w.depth_unit AS Unit, w.sonic_curve AS "Sonic curve", '
+             '(SELECT COUNT(*) FROM curves c WHERE c.path = w.path) AS Curves, w.path AS Path FROM wells w')
+    if clauses:
+        query += ' WHERE ' + ' AND '.join(clauses)
+    query += ' ORDER BY w.well, w.path LIMIT ?'
+    connection = connect(db_path)
+    try:
+        return pd.read_sql_query(query, connection, params=params + [limit])
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    db_path = CATALOG_PATH
+    if '--db' in args:
+        position = args.index('--db')
+        db_path = args[position + 1]
+        del args[position:position + 2]
+    start = time.perf_counter()
+    counts = update(args or ['.'], db_path)
+    print(', '.join(f'{count} {name}' for name, count in counts.items()) + f' in {time.perf_counter() - start:.2f} s -> {db_path}')
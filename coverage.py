@@ -0,0 +1,90 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+import shared_cache
+from las_nulls import null_runs
+
+
+# Depth buckets in the coverage chart; far fewer than samples, enough for a 600 px tall image
+BUCKETS = 300
+
+
+def gap_intervals(depth, mask):
+    # Depth of the first and last null sample of each gap
+    runs = null_runs(mask)
+    depth = np.asarray(depth)
+    return np.column_stack([depth[runs[:, 0]], depth[runs[:, 1] - 1]]) if len(runs) else np.empty((0, 2))
+
+
+def bucket_size(n, buckets=BUCKETS):
+    # Samples per bucket; the last bucket may be short, so there are ceil(n / size) <= buckets of them
+    return max(1, -(-n // max(1, min(buckets, n))))
+
+
+def bucket_coverage(mask, buckets=BUCKETS):
+    # Fraction of non-null samples in each equal depth bucket of at most `buckets`
+    n = len(mask)
+    size = bucket_size(n, buckets)
+    rows = -(-n // size)
+    padded = np.zeros(rows * size)
+    counts = np.zeros(rows * size)
+    padded[:n] = ~mask
+    counts[:n] = 1
+    return padded.reshape(rows, size).sum(axis=1) / counts.reshape(rows, size).sum(axis=1)
+
+
+def bucket_centres(depth, buckets=BUCKETS):
+    # Depth halfway between the first and last sample of each bucket
+    depth = np.asarray(depth, dtype=np.float64)
+    size = bucket_size(len(depth), buckets)
+    starts = np.arange(0, len(depth), size)
+    ends = np.minimum(starts + size, len(depth)) - 1
+    return (depth[starts] + depth[ends]) / 2
+
+
+class NullCoverage:
+    '''Per-curve coverage %, gap intervals and a bucketed coverage matrix for one well.'''
+
+    def __init__(self, well, buckets=BUCKETS):
+        depth = np.asarray(well.index)
+        null_mask = well.null_mask
+        rows = []
+        self.gaps = OrderedDict()
+        columns = []
+        for mnemonic in well.curves:
+            mask = null_mask.mask(mnemonic)
+            gaps = gap_intervals(depth, mask)
+            self.gaps[mnemonic] = gaps
+            columns.append(bucket_coverage(mask, buckets))
+            rows.append({
+                'Curve': mnemonic,
+                'Coverage %': 100 * (1 - mask.mean()) if len(mask) else 0.0,
+                'Null samples': int(mask.sum()),
+                'Gaps': len(gaps),
+                'Largest gap': float(np.max(np.abs(gaps[:, 1] - gaps[:, 0]))) if len(gaps) else 0.0,
+                'Gap intervals': ', '.join(f'{top:g}-{bottom:g}' for top, bottom in gaps[:5]) + (' ...' if len(gaps) > 5 else ''),
+            })
+        self.table = pd.DataFrame(rows)
+        self.matrix = np.column_stack(columns) if columns else np.empty((0, 0))
+        self.bucket_depth = bucket_centres(depth, buckets)
+        self.curves = list(well.curves)
+
+    def figure(self, height=600):
+        fig = go.Figure(go.Heatmap(
+            z=self.matrix, x=self.curves, y=self.bucket_depth,
+            zmin=0, zmax=1, colorscale=[[0, 'white'], [1, 'black']], showscale=False,
+            hovertemplate='%{x} at %{y}: %{z:.0%} coverage<extra></extra>'))
+        fig.update_yaxes(title='Depth', autorange='reversed')
+        fig.update_xaxes(side='top')
+        fig.update_layout(height=height, margin=dict(l=60, r=20, t=40, b=20))
+        return fig
+
+
+def null_coverage(well, buckets=BUCKETS):
+    '''NullCoverage for a well, computed once per dataset key (WellData.key).'''
+    if well.key is None:
+        return NullCoverage(well, buckets)
+    return shared_cache.shared.get_or_compute(('coverage', well.key, buckets), lambda: NullCoverage(well, buckets))
@@ -0,0 +1,29 @@
+import numpy as np
+
+import las_data
+
+
+PAGE_SIZES = (50, 100, 250, 500)
+
+
+def depth_position(depth, target):
+    '''Row of the first sample at or past target depth, by binary search (depth ascending or descending).'''
+    depth = np.asarray(depth, dtype=np.float64)
+    if len(depth) and depth[0] > depth[-1]:
+        return las_data.depth_slice(depth, None, target).start
+    return las_data.depth_slice(depth, target, None).start
+
+
+def clamp_start(start, n_rows, page_size):
+    return int(max(0, min(start, n_rows - page_size)))
+
+
+def page_start(depth, target, page_size):
+    # First row of the page that has the target depth in its middle
+    return clamp_start(depth_position(depth, target) - page_size // 2, len(depth), page_size)
+
+
+def page(frame, start, page_size):
+    '''Rows start:start + page_size of frame; only this slice is sent to the browser.'''
+    start = clamp_start(start, len(frame), page_size)
+    return frame.iloc[start:start + page_size], start
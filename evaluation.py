@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+
+import interpolation
+import porosity
+import zonation
+from las_nulls import to_float64
+
+
+# Quantities summed over a depth window, one row per porosity column
+CONTRIBUTIONS = ('negative', 'normal', 'abnormal', 'null', 'total', 'thickness', 'thickness_porosity')
+
+
+def sample_thickness(depth, step=None):
+    '''Thickness represented by each depth sample (half the distance to each neighbour).'''
+    depth = np.asarray(depth, dtype=np.float64)
+    if step is not None and np.isfinite(step) and step != 0:
+        return np.full(len(depth), abs(step))
+    if len(depth) < 2:
+        return np.ones(len(depth))
+    return np.abs(np.gradient(depth))
+
+
+def window_sums(values, thickness):
+    '''(columns, len(CONTRIBUTIONS)) sums over every sample of a (samples, columns) array.'''
+    values = np.asarray(values, dtype=np.float64)
+    thickness = np.asarray(thickness, dtype=np.float64)[:, None]
+    valid = ~np.isnan(values)
+    return np.stack([
+        np.count_nonzero(values < 0, axis=0),
+        np.count_nonzero((values >= 0) & (values <= 1), axis=0),
+        np.count_nonzero(values > 1, axis=0),
+        np.count_nonzero(~valid, axis=0),
+        np.full(values.shape[1], len(values)),
+        np.where(valid, thickness, 0.0).sum(axis=0),
+        np.where(valid, thickness * values, 0.0).sum(axis=0),
+    ], axis=-1).astype(np.float64)
+
+
+def summarise(sums, columns):
+    '''Turn window sums (columns x CONTRIBUTIONS) into the formation evaluation table.'''
+    sums = np.asarray(sums, dtype=np.float64).reshape(len(columns), len(CONTRIBUTIONS))
+    negative, normal, abnormal, null, total, thickness, thickness_porosity = sums.T
+    # An empty window (or an all-null column) has no percentages and no average: NaN, not 0 x inf
+    percent = np.divide(100.0, total, out=np.full(len(total), np.nan), where=total > 0)
+    weighted = np.divide(thickness_porosity, thickness, out=np.full(len(thickness), np.nan), where=thickness > 0)
+    matrix, fluid = zip(*(porosity.split_column(name) if name.endswith(')') else (name, '') for name in columns))
+    return pd.DataFrame({
+        'Column': list(columns),
+        'Matrix': list(matrix),
+        'Fluid': list(fluid),
+        'Negative': negative.astype(np.int64),
+        'Normal': normal.astype(np.int64),
+        'Abnormal': abnormal.astype(np.int64),
+        'Null': null.astype(np.int64),
+        'Total': total.astype(np.int64),
+        'Negative %': negative * percent,
+        'Normal %': normal * percent,
+        'Abnormal %': abnormal * percent,
+        'Null %': null * percent,
+        'Weighted average porosity': np.round(weighted, 4),
+    })
+
+
+def porosity_statistics(depth, values, columns, top=None, bottom=None, thickness=None):
+    '''Counts, percentages, null fraction and thickness-weighted mean for every column at once.
+
+    values is a (samples, columns) array; top / bottom restrict the depth window.
+    '''
+    depth = np.asarray(depth, dtype=np.float64)
+    if thickness is None:
+        thickness = sample_thickness(depth)
+    window = np.ones(len(depth), dtype=bool)
+    if top is not None:
+        window &= depth >= top
+    if bottom is not None:
+        window &= depth <= bottom
+    values = np.asarray(values, dtype=np.float64).reshape(len(depth), -1)
+    sums = window_sums(values[window], np.asarray(thickness)[window])
+    return summarise(sums, columns)
+
+
+def sweep_statistics(depth, sonic, parameters=None, top=None, bottom=None, chunk_elements=porosity.CHUNK_ELEMENTS):
+    '''porosity_statistics for every combination of a ParameterSet, accumulated chunk by chunk.
+
+    The (samples, matrices, fluids) porosity array is never held in full,
+    so large uncertainty grids run in bounded memory.
+    '''
+    parameters = porosity.ParameterSet() if parameters is None else parameters
+    depth = to_float64(depth)
+    window = np.ones(len(depth), dtype=bool)
+    if top is not None:
+        window &= depth >= top
+    if bottom is not None:
+        window &= depth <= bottom
+    thickness = sample_thickness(depth)[window]
+    sums = np.zeros((len(parameters), len(CONTRIBUTIONS)))
+    for start, stop, phi in porosity.iter_sweep(to_float64(sonic)[window], parameters, chunk_elements=chunk_elements):
+        # (samples, matrices, fluids) -> (samples, columns), fluid first as in ParameterSet.columns
+        sums += window_sums(phi.transpose(0, 2, 1).reshape(stop - start, -1), thickness[start:stop])
+    return summarise(sums, parameters.columns)
+
+
+def evaluate_well(well, sonic_curve, top=None, bottom=None, max_gap=None, parameters=None, zones=None):
+    '''Gap filling -> porosity -> statistics for one loaded well (the Formation Evaluation pipeline).
+
+    With a Zonation, a 'Zoned porosity' row is added after the matrix/fluid rows.
+    '''
+    filled = interpolation.filled_porosity(well, sonic_curve, max_gap)
+    stats = sweep_statistics(filled.depth, filled.filled, parameters, top, bottom)
+    if zones is None:
+        return stats
+    zoned = porosity_statistics(filled.depth, zones.porosity(filled.depth, filled.filled), [zonation.ZONED_COLUMN], top, bottom)
+    return pd.concat([stats, zoned], ignore_index=True)
+
+
+def contributions(values, thickness):
+    '''(samples, columns, len(CONTRIBUTIONS)) array of what each sample adds to window_sums.'''
+    values = np.asarray(values, dtype=np.float64)
+    thickness = np.broadcast_to(np.asarray(thickness, dtype=np.float64)[:, None], values.shape)
+    valid = ~np.isnan(values)
+    return np.stack([
+        values < 0,
+        (values >= 0) & (values <= 1),
+        values > 1,
+        ~valid,
+        np.ones(values.shape, dtype=bool),
+        np.where(valid, thickness, 0.0),
+        np.where(valid, thickness * values, 0.0),
+    ], axis=-1).astype(np.float64)
+
+
+class DepthIndex:
+    '''Sorted depths plus prefix sums of every porosity column and its category flags.
+
+    Any [top, bottom] window is answered with two binary searches and one
+    subtraction, independent of the number of samples in the window.
+    '''
+
+    def __init__(self, depth, values, columns, thickness=None, chunk_elements=porosity.CHUNK_ELEMENTS):
+        depth = np.asarray(depth, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64).reshape(len(depth), -1)
+        order = np.argsort(depth, kind='stable')
+        if thickness is None:
+            thickness = sample_thickness(depth)
+        self.order = order
+        self.depth = depth[order]
+        self.columns = list(columns)
+        thickness = np.asarray(thickness)[order]
+        prefix = np.zeros((len(depth) + 1, len(self.columns), len(CONTRIBUTIONS)))
+        # Chunk by chunk, so the contributions temporary stays bounded beside the prefix array
+        step = max(1, chunk_elements // max(1, len(self.columns) * len(CONTRIBUTIONS)))
+        for start in range(0, len(depth), step):
+            stop = min(start + step, len(depth))
+            rows = order[start:stop]
+            np.cumsum(contributions(values[rows], thickness[start:stop]), axis=0, out=prefix[start + 1:stop + 1])
+            prefix[start + 1:stop + 1] += prefix[start]
+        self.prefix = prefix
+
+    def __len__(self):
+        return len(self.depth)
+
+    def bounds(self, top=None, bottom=None):
+        lo = 0 if top is None else int(np.searchsorted(self.depth, top, 'left'))
+        hi = len(self.depth) if bottom is None else int(np.searchsorted(self.depth, bottom, 'right'))
+        return lo, max(lo, hi)
+
+    def rows(self, top=None, bottom=None):
+        # Positions of the window's samples in the original (unsorted) arrays
+        lo, hi = self.bounds(top, bottom)
+        return self.order[lo:hi]
+
+    def sums(self, top=None, bottom=None):
+        lo, hi = self.bounds(top, bottom)
+        return self.prefix[hi] - self.prefix[lo]
+
+    def statistics(self, top=None, bottom=None):
+        return summarise(self.sums(top, bottom), self.columns)
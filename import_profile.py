@@ -0,0 +1,62 @@
+'''Import-time profile of the app's cold start, one page module at a time.
+
+Each module is imported in a fresh interpreter with -X importtime; the
+report lists the total import time per page and the slowest modules it
+pulls in (self and cumulative time, in ms), so cold-start regressions
+show up as a diff of this output.
+
+Usage: python import_profile.py [--top N] [module ...]
+'''
+import os
+import subprocess
+import sys
+
+
+# Imported by Main.py at start-up, then one page at a time on first selection
+DEFAULT_MODULES = ('streamlit', 'streamlit_option_menu', 'Home', 'About', 'Guide', 'Info', 'Interpretation')
+
+
+def import_times(module):
+    '''[(name, self_us, cumulative_us, depth)] for everything imported by `import module`.'''
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if completed.returncode != 0:
+        raise ImportError(completed.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def report(modules=DEFAULT_MODULES, top=10):
+    seen = set()
+    for module in modules:
+        try:
+            rows = import_times(module)
+        except ImportError as error:
+            print(f'{module}: failed ({error})\n')
+            continue
+        total = next((cumulative for name, _, cumulative, _ in rows if name == module), 0)
+        # Modules already paid for by earlier entries are free when this page loads
+        new = [row for row in rows if row[0] not in seen]
+        extra = sum(self_us for _, self_us, _, _ in new)
+        seen.update(name for name, _, _, _ in rows)
+        print(f'{module}: {total / 1000:.1f} ms standalone, {extra / 1000:.1f} ms on top of the modules above')
+        for name, self_us, cumulative_us, _ in sorted(new, key=lambda row: row[1], reverse=True)[:top]:
+            print(f'    {self_us / 1000:8.1f} ms self {cumulative_us / 1000:9.1f} ms cumulative  {name}')
+        print()
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    top = 10
+    if '--top' in args:
+        position = args.index('--top')
+        top = int(args[position + 1])
+        del args[position:position + 2]
+    report(args or DEFAULT_MODULES, top)
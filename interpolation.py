@@ -0,0 +1,71 @@
+import numpy as np
+
+import porosity
+import shared_cache
+from las_nulls import null_runs, to_float64
+
+
+def fill_gaps(depth, values, max_gap=None):
+    '''Linearly interpolate (np.interp over depth) the null gaps strictly inside a curve.
+
+    Leading and trailing nulls are never extrapolated. Gaps whose bracketing
+    samples are more than max_gap depth units apart stay null, so long
+    washouts are not bridged; None or 0 fills every inside gap.
+    '''
+    depth = to_float64(depth)
+    values = to_float64(values)
+    filled = values.copy()
+    nulls = np.isnan(values) & ~np.isnan(depth)
+    valid = ~np.isnan(values) & ~np.isnan(depth)
+    if not nulls.any() or valid.sum() < 2:
+        return filled
+
+    order = np.argsort(depth, kind='stable')
+    filled[nulls] = np.interp(depth[nulls], depth[order][valid[order]], values[order][valid[order]],
+                              left=np.nan, right=np.nan)
+
+    runs = null_runs(np.isnan(values))
+    inside = runs[(runs[:, 0] > 0) & (runs[:, 1] < len(values))]
+    if max_gap:
+        # Distance between the valid samples either side of each gap
+        lengths = np.abs(depth[inside[:, 1]] - depth[inside[:, 0] - 1])
+        inside = inside[lengths <= max_gap]
+    keep = np.zeros(len(values) + 1, dtype=np.int64)
+    np.add.at(keep, inside[:, 0], 1)
+    np.add.at(keep, inside[:, 1], -1)
+    filled[np.isnan(values) & ~np.cumsum(keep[:-1]).astype(bool)] = np.nan
+    return filled
+
+
+class FilledPorosity:
+    '''Gap-filled sonic curve of one well.'''
+
+    def __init__(self, depth, sonic, max_gap=None):
+        self.max_gap = max_gap
+        self.depth = to_float64(depth)
+        self.raw = to_float64(sonic)
+        self.filled = fill_gaps(self.depth, self.raw, max_gap)
+
+    @property
+    def filled_count(self):
+        return int(np.count_nonzero(np.isnan(self.raw) & ~np.isnan(self.filled)))
+
+
+def filled_porosity(well, sonic_curve, max_gap=None):
+    '''FilledPorosity for a well's sonic curve, computed once per (dataset, curve, gap limit).'''
+    if well.key is None:
+        return FilledPorosity(well.index, well.data[sonic_curve], max_gap)
+    return shared_cache.shared.get_or_compute(
+        ('filled', well.key, sonic_curve, max_gap or None),
+        lambda: FilledPorosity(well.index, well.data[sonic_curve], max_gap))
+
+
+def filled_sweep(well, sonic_curve, max_gap=None, parameters=None):
+    '''PorosityResult of a parameter set over the gap-filled sonic curve, shared between sessions.'''
+    parameters = porosity.ParameterSet() if parameters is None else parameters
+    filled = filled_porosity(well, sonic_curve, max_gap)
+    if well.key is None:
+        return porosity.sweep(filled.depth, filled.filled, parameters)
+    return shared_cache.shared.get_or_compute(
+        ('sweep', well.key, sonic_curve, max_gap or None, parameters.key),
+        lambda: porosity.sweep(filled.depth, filled.filled, parameters))
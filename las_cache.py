@@ -0,0 +1,162 @@
+import hashlib
+import os
+
+import las_nulls
+import las_sidecar
+import las_stream
+import shared_cache
+import units
+from las_data import WellData
+
+
+CACHE_DIR = os.environ.get('SONIC_LAS_CACHE_DIR', '.las_cache')
+# Total size of the sidecar files kept in CACHE_DIR; least recently used files are deleted beyond it
+DISK_BUDGET = int(float(os.environ.get('SONIC_LAS_CACHE_MB', 1024)) * 2 ** 20)
+
+
+def content_key(data):
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def parse_with_lasio(source):
+    # source is a path or LAS bytes (read through a lazily decoded buffer, no temporary file);
+    # nulls are left to las_nulls so every curve comes back as float64 with NaN.
+    # Imported here so that the streaming reader and sidecars never pay for lasio.
+    import lasio
+
+    las_file = lasio.read(las_stream.text_buffer(source) if isinstance(source, bytes) else source, null_policy='none')
+    return units.convert_well(las_nulls.normalise_well(WellData.from_lasfile(las_file)))
+
+
+def parse_las(source):
+    '''WellData from a path or LAS bytes: the chunked streaming reader, lasio for files it cannot read.'''
+    try:
+        return las_stream.read_well(source)
+    except (ValueError, KeyError, IndexError):
+        return parse_with_lasio(source)
+
+
+def parse_las_bytes(data):
+    return parse_las(data)
+
+
+class LASParseCache:
+    '''Parsed wells keyed on a hash of the LAS file bytes.
+
+    Wells are kept in memory in the process-wide shared cache, so sessions
+    opening the same file share one read-only copy within its memory
+    budget; every parse is also written to cache_dir as a sidecar file so
+    that evicted wells and new processes memory-map the arrays instead of
+    re-parsing the ASCII file. The disk tier is kept within disk_budget bytes,
+    least recently used (by mtime, refreshed on every read) first out; an
+    empty cache_dir disables it.
+    '''
+
+    def __init__(self, cache=None, cache_dir=CACHE_DIR, disk_budget=DISK_BUDGET):
+        self.cache = shared_cache.shared if cache is None else cache
+        self.cache_dir = cache_dir
+        self.disk_budget = disk_budget
+
+    def __contains__(self, key):
+        return ('well', key) in self.cache
+
+    def disk_path(self, key):
+        # Path keys contain separators, so the file is named after a hash of the key
+        return os.path.join(self.cache_dir, content_key(key.encode('utf-8')) + las_sidecar.SUFFIX)
+
+    def lookup(self, key):
+        # Memory tier only
+        return self.cache.get(('well', key))
+
+    def get(self, key):
+        well = self.lookup(key)
+        if well is not None:
+            return well
+        well = self.read_disk(key)
+        if well is not None:
+            self.put(key, well, spill=False)
+        return well
+
+    def put(self, key, well, spill=True):
+        well.key = key
+        self.cache.put(('well', key), well, well.nbytes)
+        if spill:
+            self.write_disk(key, well)
+
+    def load_bytes(self, data):
+        key = content_key(data)
+        well = self.get(key)
+        if well is None:
+            well = parse_las_bytes(data)
+            self.put(key, well)
+        return well
+
+    def load_path(self, path):
+        # An up-to-date sidecar next to the file skips parsing; otherwise the file is streamed, never read whole
+        stat = os.stat(path)
+        key = f'{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}'
+        well = self.lookup(key)
+        if well is not None:
+            return well
+        well = las_sidecar.load_fresh_sidecar(path)
+        if well is not None:
+            self.put(key, well, spill=False)
+            return well
+        well = self.read_disk(key)
+        if well is not None:
+            self.put(key, well, spill=False)
+            return well
+        well = parse_las(path)
+        self.put(key, well)
+        return well
+
+    def read_disk(self, key):
+        if not self.cache_dir or not os.path.exists(self.disk_path(key)):
+            return None
+        path = self.disk_path(key)
+        try:
+            os.utime(path)
+            return las_sidecar.open_sidecar(path).to_well_data()
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def write_disk(self, key, well):
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            las_sidecar.write_sidecar(well, self.disk_path(key))
+            self.prune_disk()
+        except (OSError, TypeError, ValueError):
+            pass
+
+    def prune_disk(self):
+        # Oldest files first until the directory fits the budget; open memmaps of deleted files stay valid
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(las_sidecar.SUFFIX) and entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_budget:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        self.cache.clear('well')
+
+
+parse_cache = LASParseCache()
+
+
+def load_las_bytes(data):
+    return parse_cache.load_bytes(data)
+
+
+def load_las_path(path):
+    return parse_cache.load_path(path)
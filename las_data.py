@@ -0,0 +1,131 @@
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+from las_nulls import NullMask
+
+# Mirrors the attributes of lasio.HeaderItem / lasio.CurveItem used by the pages
+HeaderItem = namedtuple('HeaderItem', ['mnemonic', 'unit', 'value', 'descr'])
+
+HEADER_SECTIONS = ('Version', 'Well', 'Parameter')
+
+
+def depth_slice(depth, top=None, bottom=None):
+    '''Slice of the samples between top and bottom, by binary search (depth ascending or descending).'''
+    if len(depth) == 0 or (top is None and bottom is None):
+        return slice(0, len(depth))
+    lo = -np.inf if top is None else top
+    hi = np.inf if bottom is None else bottom
+    if depth[-1] >= depth[0]:
+        return slice(int(np.searchsorted(depth, lo, 'left')), int(np.searchsorted(depth, hi, 'right')))
+    # Decreasing depth (logged upwards): search on the reversed view
+    reversed_depth = depth[::-1]
+    start = len(depth) - int(np.searchsorted(reversed_depth, hi, 'right'))
+    stop = len(depth) - int(np.searchsorted(reversed_depth, lo, 'left'))
+    return slice(start, stop)
+
+
+def header_item(item):
+    # lasio may hand back numpy scalars; keep plain Python values so headers serialise
+    value = item.value.item() if isinstance(item.value, np.generic) else item.value
+    return HeaderItem(item.mnemonic, item.unit, value, item.descr)
+
+
+class WellData:
+    '''Parsed LAS file: header items, curve catalog and one float64 array per curve.
+
+    The first curve is the depth index, as in the ~Curve block.
+    '''
+
+    def __init__(self, header, curves, data, other='', null_mask=None):
+        self.header = header
+        self.curves = curves
+        self.data = data
+        self.other = other
+        self._null_mask = null_mask
+        # Set by las_cache: content hash (or path/mtime) identifying the dataset
+        self.key = None
+        # Parsed wells are shared between reruns, so the arrays are read-only
+        for array in self.data.values():
+            array.flags.writeable = False
+
+    def keys(self):
+        return self.curves.keys()
+
+    @property
+    def index_mnemonic(self):
+        return next(iter(self.curves))
+
+    @property
+    def index(self):
+        return self.data[self.index_mnemonic]
+
+    @property
+    def null_mask(self):
+        # Nulls are NaN once loaded, so the bitmap can always be rebuilt from the data
+        if self._null_mask is None:
+            self._null_mask = NullMask.from_data(self.data)
+        return self._null_mask
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.data.values())
+
+    def df(self):
+        # Same layout as lasio.LASFile.df(): depth index, one column per curve
+        columns = OrderedDict((mnemonic, self.data[mnemonic]) for mnemonic in list(self.curves)[1:])
+        return pd.DataFrame(columns, index=pd.Index(self.index, name=self.index_mnemonic), copy=True)
+
+    def read(self, curves=None, top=None, bottom=None):
+        '''Depth index and the given curves (default: all) between top and bottom, as views.
+
+        On a memory-mapped well only the pages of these curves and rows are read.
+        '''
+        window = depth_slice(self.index, top, bottom)
+        names = [self.index_mnemonic] + [c for c in (list(self.curves)[1:] if curves is None else curves) if c != self.index_mnemonic]
+        return OrderedDict((name, self.data[name][window]) for name in names)
+
+    def curves_text(self):
+        rows = [('Mnemonic', 'Unit', 'Value', 'Description'), ('--------', '----', '-----', '-----------')]
+        rows += [(item.mnemonic, item.unit, str(item.value), item.descr) for item in self.curves.values()]
+        widths = [max(len(row[i]) for row in rows) for i in range(3)]
+        return '\n'.join(
+            '  '.join(cell.ljust(width) for cell, width in zip(row[:3], widths)) + '  ' + row[3]
+            for row in rows)
+
+    @classmethod
+    def from_lasfile(cls, las_file):
+        header = OrderedDict()
+        for section in HEADER_SECTIONS:
+            header[section] = OrderedDict(
+                (item.mnemonic, header_item(item))
+                for item in las_file.header.get(section, []))
+        curves = OrderedDict(
+            (curve.mnemonic, header_item(curve))
+            for curve in las_file.curves)
+        data = OrderedDict(
+            (curve.mnemonic, np.asarray(curve.data, dtype=np.float64))
+            for curve in las_file.curves)
+        return cls(header, curves, data, las_file.other)
+
+    def metadata(self):
+        # JSON-serialisable header / curve catalog, used by the on-disk stores
+        def items(section):
+            return [list(item) for item in section.values()]
+
+        return {
+            'header': {section: items(items_) for section, items_ in self.header.items()},
+            'curves': items(self.curves),
+            'other': self.other,
+        }
+
+    @classmethod
+    def from_metadata(cls, metadata, arrays):
+        def items(rows):
+            return OrderedDict((row[0], HeaderItem(*row)) for row in rows)
+
+        header = OrderedDict((section, items(rows)) for section, rows in metadata['header'].items())
+        curves = items(metadata['curves'])
+        data = OrderedDict(zip(curves, arrays))
+        return cls(header, curves, data, metadata.get('other', ''))
@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Sentinels mapped to NaN in addition to the NULL value declared in ~Well
+SENTINELS = tuple(
+    float(value) for value in os.environ.get('SONIC_NULL_SENTINELS', '-999.25,-9999.25,-999,-9999').split(',') if value)
+# Anything below this is treated as a null as well (None disables it)
+NULL_FLOOR = -9000.0
+
+
+def header_null_value(header):
+    item = header.get('Well', {}).get('NULL')
+    if item is None:
+        return None
+    try:
+        return float(item.value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_float64(values):
+    if isinstance(values, np.ndarray) and values.dtype.kind == 'f':
+        return values.astype(np.float64, copy=False)
+    # None / strings become NaN instead of forcing an object column
+    return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64)
+
+
+def normalise_array(values, null_value=None, sentinels=SENTINELS, floor=NULL_FLOOR):
+    array = np.array(to_float64(values), dtype=np.float64, copy=True)
+    nulls = np.isin(array, [v for v in (null_value, *sentinels) if v is not None])
+    if floor is not None:
+        nulls |= array < floor
+    array[nulls] = np.nan
+    return array
+
+
+def null_runs(mask):
+    '''[start, stop) sample index pairs of every run of True in mask (run-length encoding).'''
+    padded = np.zeros(len(mask) + 2, dtype=np.int8)
+    padded[1:-1] = mask
+    edges = np.diff(padded)
+    return np.column_stack([np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)])
+
+
+class NullMask:
+    '''Per-curve null bitmaps (np.packbits of the NaN mask), kept for reporting.'''
+
+    def __init__(self, length, bitmaps):
+        self.length = length
+        self.bitmaps = bitmaps
+
+    @classmethod
+    def from_data(cls, data):
+        length = len(next(iter(data.values()))) if data else 0
+        return cls(length, {mnemonic: np.packbits(np.isnan(array)) for mnemonic, array in data.items()})
+
+    def mask(self, mnemonic):
+        return np.unpackbits(self.bitmaps[mnemonic], count=self.length).astype(bool)
+
+    def count(self, mnemonic):
+        return int(np.unpackbits(self.bitmaps[mnemonic], count=self.length).sum())
+
+    def summary(self):
+        counts = {mnemonic: self.count(mnemonic) for mnemonic in self.bitmaps}
+        return pd.DataFrame({
+            'Curve': list(counts),
+            'Null count': list(counts.values()),
+            'Null %': [100 * c / self.length if self.length else 0.0 for c in counts.values()],
+        })
+
+
+def normalise_well(well, sentinels=SENTINELS, floor=NULL_FLOOR):
+    # Header NULL and sentinels -> NaN on every curve but the depth index
+    null_value = header_null_value(well.header)
+    index = well.index_mnemonic
+    data = type(well.data)(
+        (mnemonic, array if mnemonic == index else normalise_array(array, null_value, sentinels, floor))
+        for mnemonic, array in well.data.items())
+    return type(well)(well.header, well.curves, data, well.other, NullMask.from_data(data))
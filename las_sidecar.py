@@ -0,0 +1,138 @@
+'''Binary columnar sidecar files for parsed LAS data.
+
+Layout: a fixed 24-byte preamble (magic, format version, metadata length),
+the JSON metadata (header items, curve catalog, column table) and then one
+contiguous little-endian array per curve, each aligned to 64 bytes. Curves
+are reopened with numpy.memmap, so only the pages actually read are loaded.
+
+Usage: python las_sidecar.py [--float32] file.las [file.las ...]
+'''
+import json
+import os
+import struct
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+from las_data import WellData
+
+
+MAGIC = b'SONICLAS'
+# 2: sonic curves are stored in us/ft (units.convert_well)
+FORMAT_VERSION = 2
+PREAMBLE = struct.Struct('<8sIIQ')
+ALIGN = 64
+SUFFIX = '.lasbin'
+
+
+def align(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def sidecar_path(las_path):
+    return os.path.splitext(las_path)[0] + SUFFIX
+
+
+def is_fresh(las_path, path=None):
+    path = path or sidecar_path(las_path)
+    try:
+        return os.path.getmtime(path) >= os.path.getmtime(las_path)
+    except OSError:
+        return False
+
+
+def write_sidecar(well, path, dtype=np.float64):
+    # The depth index always stays float64; other curves may be stored as float32
+    columns = []
+    arrays = []
+    offset = 0
+    for i, (mnemonic, array) in enumerate(well.data.items()):
+        column_dtype = np.dtype(np.float64 if i == 0 else dtype).newbyteorder('<')
+        array = np.ascontiguousarray(array, dtype=column_dtype)
+        columns.append({'mnemonic': mnemonic, 'dtype': array.dtype.str, 'offset': offset, 'length': len(array)})
+        arrays.append(array)
+        offset = align(offset + array.nbytes)
+
+    metadata = well.metadata()
+    metadata['columns'] = columns
+    encoded = json.dumps(metadata).encode('utf-8')
+    data_start = align(PREAMBLE.size + len(encoded))
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(encoded)))
+            f.write(encoded)
+            for column, array in zip(columns, arrays):
+                f.seek(data_start + column['offset'])
+                f.write(array.tobytes())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+class SidecarFile:
+    '''Memory-mapped view of a sidecar file; nothing is parsed beyond the JSON header.'''
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, _, length = PREAMBLE.unpack(f.read(PREAMBLE.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f'{path} is not a sonic LAS sidecar file (version {FORMAT_VERSION})')
+            self.metadata = json.loads(f.read(length).decode('utf-8'))
+        self.data_start = align(PREAMBLE.size + length)
+        self.columns = OrderedDict((column['mnemonic'], column) for column in self.metadata['columns'])
+        self.maps = {}
+
+    @property
+    def index_mnemonic(self):
+        return next(iter(self.columns))
+
+    def curve(self, mnemonic):
+        if mnemonic not in self.maps:
+            column = self.columns[mnemonic]
+            if column['length'] == 0:
+                self.maps[mnemonic] = np.empty(0, dtype=column['dtype'])
+            else:
+                self.maps[mnemonic] = np.memmap(
+                    self.path, dtype=column['dtype'], mode='r',
+                    offset=self.data_start + column['offset'], shape=(column['length'],))
+        return self.maps[mnemonic]
+
+    def to_well_data(self):
+        # Curves stay memory-mapped; WellData.read touches only the curves and rows asked for
+        return WellData.from_metadata(self.metadata, [self.curve(name) for name in self.columns])
+
+
+def open_sidecar(path):
+    return SidecarFile(path)
+
+
+def load_fresh_sidecar(las_path):
+    # WellData backed by memmaps when an up-to-date sidecar sits next to the .las file
+    path = sidecar_path(las_path)
+    if not is_fresh(las_path, path):
+        return None
+    try:
+        return open_sidecar(path).to_well_data()
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def convert(las_path, dtype=np.float64):
+    import las_cache
+
+    with open(las_path, 'rb') as f:
+        well = las_cache.parse_las_bytes(f.read())
+    return write_sidecar(well, sidecar_path(las_path), dtype)
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    dtype = np.float32 if '--float32' in args else np.float64
+    for las_path in (a for a in args if not a.startswith('--')):
+        print(f'{las_path} -> {convert(las_path, dtype)}')
@@ -0,0 +1,304 @@
+import io
+import re
+from collections import OrderedDict
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+import las_nulls
+import units
+from las_data import HeaderItem, WellData
+
+
+CHUNK_SIZE = 50000
+
+SECTION_NAMES = {
+    'V': 'Version',
+    'W': 'Well',
+    'C': 'Curves',
+    'P': 'Parameter',
+    'O': 'Other',
+    'A': 'Data',
+}
+
+# Value / description separator: the first colon that is not part of a time such as 11:58
+DESCR_SEPARATOR = re.compile(r'(?<!\d):|:(?!\d)')
+
+# LAS 1.2 keeps the value after the colon for these ~Well items only
+LAS12_VALUE_FIRST = ('STRT', 'STOP', 'STEP', 'NULL')
+
+# Start of the ~A section in the raw bytes
+DATA_MARKER = re.compile(rb'^[ \t]*~A', re.MULTILINE | re.IGNORECASE)
+
+# lasio's default read policy: comma decimal marks and run-on numbers
+# ('7.330-19508.961' is two values, '7.020101130.188' two unreadable ones)
+COMMA_DECIMAL = (re.compile(r'(\d),(\d)'), r'\1.\2')
+RUNON_HYPHEN = (re.compile(r'(\d)-(\d)'), r'\1 -\2')
+RUNON_DOT = (re.compile(r'-?\d*\.\d*\.\d*|NaN[\.-]\d+'), ' NaN NaN ')
+
+
+def to_number(value):
+    try:
+        return float(value) if '.' in value or 'e' in value.lower() else int(value)
+    except ValueError:
+        return value
+
+
+def detect_encoding(data):
+    # UTF-8 unless the header sections are not valid UTF-8 (then latin-1); ~A holds ASCII numbers
+    match = DATA_MARKER.search(data)
+    try:
+        data[:match.start() if match else len(data)].decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+def text_buffer(data):
+    '''Text stream over the bytes of a LAS file, decoded as it is read, with universal newlines.
+
+    The file is never held as one str, and reading only the header never
+    decodes the ~A section.
+    '''
+    return io.TextIOWrapper(io.BytesIO(data), encoding=detect_encoding(data), errors='replace', newline=None)
+
+
+def parse_header_line(line, section, version):
+    mnemonic, _, rest = line.partition('.')
+    if rest[:1].isspace() or not rest:
+        unit = ''
+    else:
+        unit, _, rest = rest.partition(' ')
+        rest = ' ' + rest
+    match = DESCR_SEPARATOR.search(rest)
+    if match:
+        value, descr = rest[:match.start()], rest[match.end():]
+    else:
+        value, descr = rest, ''
+    # Upper case, as lasio's default mnemonic_case
+    mnemonic = mnemonic.strip().upper() or 'UNKNOWN'
+    if version < 2 and section == 'Well' and mnemonic.upper() not in LAS12_VALUE_FIRST:
+        value, descr = descr, value
+    value = value.strip()
+    if section in ('Version', 'Well', 'Parameter') and value:
+        value = to_number(value)
+    return HeaderItem(mnemonic, units.strip_brackets(unit), value, descr.strip())
+
+
+def unique_mnemonics(items):
+    # Same renaming as lasio for repeated curves: GR, GR:1, GR:2 ...
+    counts = {}
+    for item in items:
+        counts[item.mnemonic] = counts.get(item.mnemonic, 0) + 1
+    seen = {}
+    renamed = []
+    for item in items:
+        if counts[item.mnemonic] > 1:
+            seen[item.mnemonic] = seen.get(item.mnemonic, 0) + 1
+            item = item._replace(mnemonic=f'{item.mnemonic}:{seen[item.mnemonic]}')
+        renamed.append(item)
+    return renamed
+
+
+def read_header(f):
+    '''Read the ~Version, ~Well, ~Curve and ~Parameter sections from an open text file.
+
+    Stops at the ~A line and returns (header, curves, other); the file is left
+    positioned at the first data line.
+    '''
+    header = OrderedDict((name, OrderedDict()) for name in ('Version', 'Well', 'Parameter'))
+    curve_items = []
+    other = []
+    section = None
+    while True:
+        line = f.readline()
+        if not line:
+            break
+        stripped = line.strip()
+        if stripped.startswith('~'):
+            section = SECTION_NAMES.get(stripped[1:2].upper())
+            if section == 'Data':
+                break
+            continue
+        if section == 'Other':
+            other.append(line.rstrip('\n'))
+            continue
+        if not stripped or stripped.startswith('#') or section is None:
+            continue
+        version = header['Version'].get('VERS')
+        version = version.value if version is not None and isinstance(version.value, float) else 2.0
+        item = parse_header_line(stripped, section, version)
+        if section == 'Curves':
+            curve_items.append(item)
+        else:
+            header[section][item.mnemonic] = item
+
+    curves = OrderedDict((item.mnemonic, item) for item in unique_mnemonics(curve_items))
+    return header, curves, '\n'.join(other)
+
+
+def data_lines(lines):
+    # Non-empty data lines, comments dropped
+    return [line for line in (line.replace('\x1a', '').strip() for line in lines) if line and not line.startswith('#')]
+
+
+def read_substitutions(lines):
+    '''Substitutions applied to every data line, chosen from the first lines of the ~A section.
+
+    As in lasio, the hyphen run-on fix is left out when every sampled line
+    has a hyphen (negative values or dates in every row).
+    '''
+    sample = data_lines(lines[:21])
+    if sample and all('-' in line for line in sample):
+        return [COMMA_DECIMAL, RUNON_DOT]
+    return [COMMA_DECIMAL, RUNON_HYPHEN, RUNON_DOT]
+
+
+def substituted_lines(lines, substitutions):
+    text = '\n'.join(data_lines(lines))
+    for pattern, replacement in substitutions:
+        text = pattern.sub(replacement, text)
+    return text.split('\n') if text else []
+
+
+def parse_tokens(tokens):
+    try:
+        return np.array(tokens, dtype=np.float64)
+    except ValueError:
+        return pd.to_numeric(pd.Series(tokens, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+
+
+def parse_values(lines, substitutions=None):
+    '''Every value of a block of data lines as one flat float64 array (wrapped files).'''
+    substitutions = read_substitutions(lines) if substitutions is None else substitutions
+    return parse_tokens(' '.join(substituted_lines(lines, substitutions)).split())
+
+
+def parse_rows(lines, ncurves, substitutions=None):
+    '''(rows, ncurves) float64 array with one row per data line (WRAP=NO), and the number of rejected lines.
+
+    A line with too few values is padded with NaN; a line with too many is
+    rejected, so a bad line never shifts the rows after it.
+    '''
+    substitutions = read_substitutions(lines) if substitutions is None else substitutions
+    rows = [line.split() for line in substituted_lines(lines, substitutions)]
+    counts = np.fromiter(map(len, rows), dtype=np.intp, count=len(rows))
+    if (counts == ncurves).all():
+        return parse_tokens([token for row in rows for token in row]).reshape(len(rows), ncurves), 0
+    keep = counts <= ncurves
+    values = parse_tokens([token for row, kept in zip(rows, keep) if kept for token in row])
+    block = np.full((int(keep.sum()), ncurves), np.nan)
+    # Row-major fill of the leading counts[i] cells of every kept row
+    block[np.arange(ncurves)[None, :] < counts[keep][:, None]] = values
+    return block, int(len(rows) - keep.sum())
+
+
+class LASStreamReader:
+    '''Reads the header eagerly and the ~ASCII section lazily, chunk_size depth samples at a time.
+
+    Only the requested curves are kept from each chunk, so memory stays bounded
+    by chunk_size x number of requested curves whatever the size of the file.
+    '''
+
+    def __init__(self, source, chunk_size=CHUNK_SIZE, encoding='utf-8'):
+        # source is a path or the bytes of a LAS file (an upload)
+        self.source = source
+        self.path = source if isinstance(source, str) else 'uploaded file'
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        with self.open() as f:
+            self.header, self.curves, self.other = read_header(f)
+            self.data_offset = f.tell()
+        if not self.curves:
+            raise ValueError(f'{self.path} has no ~Curve items')
+        wrap = self.header['Version'].get('WRAP')
+        self.wrapped = wrap is not None and str(wrap.value).strip().upper().startswith('Y')
+        # Unwrapped data lines with more values than curves, skipped by iter_blocks
+        self.rejected_rows = 0
+
+    def open(self):
+        if isinstance(self.source, bytes):
+            return text_buffer(self.source)
+        return open(self.source, encoding=self.encoding, errors='replace')
+
+    @property
+    def index_mnemonic(self):
+        return next(iter(self.curves))
+
+    @property
+    def null_value(self):
+        return las_nulls.header_null_value(self.header)
+
+    def column_indices(self, curves=None):
+        names = list(self.curves)
+        if curves is None:
+            return names, list(range(len(names)))
+        selected = [self.index_mnemonic] + [c for c in curves if c != self.index_mnemonic]
+        missing = [c for c in selected if c not in self.curves]
+        if missing:
+            raise KeyError(f'Curves not found in {self.path}: {", ".join(missing)}')
+        return selected, [names.index(c) for c in selected]
+
+    def iter_blocks(self, curves=None, chunk_size=None):
+        '''Yield (names, block) with block a (rows, len(names)) float64 array; depth is column 0.
+
+        WRAP=NO files are parsed line by line (see parse_rows); wrapped files
+        as one stream of values, ncurves values per depth sample.
+        '''
+        chunk_size = chunk_size or self.chunk_size
+        names, indices = self.column_indices(curves)
+        ncurves = len(self.curves)
+        null_value = self.null_value
+        substitutions = None
+
+        pending_values = np.empty(0, dtype=np.float64)
+        pending_rows = []
+        pending_count = 0
+        with self.open() as f:
+            f.seek(self.data_offset)
+            while True:
+                lines = list(islice(f, chunk_size))
+                if lines:
+                    if substitutions is None:
+                        substitutions = read_substitutions(lines)
+                    if self.wrapped:
+                        values = parse_values(lines, substitutions)
+                        if len(pending_values):
+                            values = np.concatenate([pending_values, values])
+                        # Wrapped files spread one depth sample over several lines
+                        nrows = len(values) // ncurves
+                        pending_values = values[nrows * ncurves:]
+                        block = values[:nrows * ncurves].reshape(nrows, ncurves)
+                    else:
+                        block, rejected = parse_rows(lines, ncurves, substitutions)
+                        self.rejected_rows += rejected
+                    block = block[:, indices]
+                    block[:, 1:] = las_nulls.normalise_array(block[:, 1:], null_value)
+                    pending_rows.append(block)
+                    pending_count += len(block)
+
+                while pending_count >= chunk_size or (not lines and pending_count):
+                    rows = np.concatenate(pending_rows) if len(pending_rows) > 1 else pending_rows[0]
+                    yield names, rows[:chunk_size]
+                    rest = rows[chunk_size:]
+                    pending_rows = [rest] if len(rest) else []
+                    pending_count = len(rest)
+                if not lines:
+                    break
+
+
+def read_well(source, curves=None, chunk_size=CHUNK_SIZE):
+    '''WellData without lasio from a path or LAS bytes, with the depth index and the given curves only (default: all).
+
+    The file is parsed chunk by chunk; nulls are already NaN from
+    iter_blocks, and only the kept columns are held beyond one chunk.
+    '''
+    reader = LASStreamReader(source, chunk_size)
+    names, _ = reader.column_indices(curves)
+    blocks = [block for _, block in reader.iter_blocks(curves)]
+    items = OrderedDict((name, reader.curves[name]) for name in names)
+    # One copy per curve out of the chunks
+    data = OrderedDict((name, np.concatenate([block[:, i] for block in blocks]) if blocks else np.empty(0))
+                       for i, name in enumerate(names))
+    return units.convert_well(WellData(reader.header, items, data, reader.other))
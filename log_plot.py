@@ -0,0 +1,181 @@
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+import las_data
+import porosity
+import shared_cache
+
+
+# Log plots are drawn 1000 px high; two points per pixel row is all the browser can show
+PLOT_HEIGHT = 1000
+POINTS_PER_PIXEL = 2
+
+
+def minmax_indices(values, n_buckets):
+    '''Indices of the min and max sample of each of n_buckets equal buckets.
+
+    Keeping both extremes means single-sample spikes (cycle skips) survive
+    decimation. Buckets that are entirely null keep one NaN sample so the
+    gap is still drawn as a gap.
+    '''
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = values
+    buckets = padded.reshape(n_buckets, size)
+    empty = np.isnan(buckets).all(axis=1)
+
+    start = np.arange(n_buckets) * size
+    lo = start + np.argmin(np.where(np.isnan(buckets), np.inf, buckets), axis=1)
+    hi = start + np.argmax(np.where(np.isnan(buckets), -np.inf, buckets), axis=1)
+    lo[empty] = start[empty]
+    hi[empty] = start[empty]
+    indices = np.unique(np.concatenate([lo, hi]))
+    return indices[indices < n]
+
+
+def decimate(depth, values, max_points=PLOT_HEIGHT * POINTS_PER_PIXEL):
+    depth = np.asarray(depth)
+    values = np.asarray(values)
+    if len(values) <= max_points:
+        return depth, values
+    indices = minmax_indices(values, max(1, max_points // 2))
+    return depth[indices], values[indices]
+
+
+def track_xy(frame, column, top=None, bottom=None, height=PLOT_HEIGHT):
+    '''x / y arguments for a vertical log track, cut to [top, bottom] and decimated for height px.
+
+    Zooming into a narrower depth window therefore brings back full resolution;
+    height=None keeps every sample.
+    '''
+    depth = frame['Depth'].to_numpy(dtype=np.float64)
+    window = las_data.depth_slice(depth, top, bottom)
+    depth = depth[window]
+    values = frame[column].to_numpy(dtype=np.float64)[window]
+    if height is None:
+        return {'x': values, 'y': depth}
+    y, x = decimate(depth, values, height * POINTS_PER_PIXEL)
+    return {'x': x, 'y': y}
+
+
+# Above this many points in one figure the tracks are drawn with WebGL (Scattergl)
+WEBGL_THRESHOLD = int(os.environ.get('SONIC_WEBGL_THRESHOLD', 10000))
+RENDER_MODES = ('Auto', 'SVG', 'WebGL')
+
+
+def figure_points(fig):
+    return sum(len(trace.y) for trace in fig.data if trace.y is not None)
+
+
+def use_webgl(fig, mode='Auto', threshold=WEBGL_THRESHOLD):
+    if mode == 'Auto':
+        return figure_points(fig) > threshold
+    return mode == 'WebGL'
+
+
+def apply_render_mode(fig, mode='Auto', threshold=WEBGL_THRESHOLD):
+    '''Swap every Scatter trace for Scattergl (or back) according to mode.
+
+    Axis settings live on the layout, so the reversed, shared depth axis set
+    up by the track configuration is unaffected by the swap.
+    '''
+    target = go.Scattergl if use_webgl(fig, mode, threshold) else go.Scatter
+    traces = []
+    for trace in fig.data:
+        if isinstance(trace, (go.Scatter, go.Scattergl)) and not isinstance(trace, target):
+            properties = trace.to_plotly_json()
+            properties.pop('type', None)
+            trace = target(properties)
+        traces.append(trace)
+    fig.data = ()
+    fig.add_traces(traces)
+    return fig
+
+
+SONIC_RANGE = [140, 40]
+POROSITY_RANGE = [-0.15, 1.51]
+TRACK_WIDTH = 350
+
+ABBREVIATIONS = {
+    'Sandstone': 'SS',
+    'Limestone': 'LS',
+    'Dolomite': 'DL',
+    'Seawater': 'SW',
+    'Freshwater': 'FW',
+}
+
+
+def track_name(column):
+    # Legend name, e.g. 'Sandstone (Seawater)' -> 'Sonic Porosity SS-SW Scale (p.u.)'
+    if not column.endswith(')'):
+        return column
+    matrix, fluid = porosity.split_column(column)
+    title = 'Sonic Porosity'
+    if matrix.startswith(porosity.CORRECTED_PREFIX):
+        matrix, title = matrix[len(porosity.CORRECTED_PREFIX):], 'Corrected Sonic Porosity'
+    return f'{title} {ABBREVIATIONS.get(matrix, matrix)}-{ABBREVIATIONS.get(fluid, fluid)} Scale (p.u.)'
+
+
+def configure_track(fig, track_num, x_title, x_range, y_title=None):
+    fig.update_xaxes(
+        title=x_title,
+        ticks="inside",
+        nticks=5,
+        minor_ticks='inside',
+        minor_showgrid=True,
+        showline=True,
+        anchor='free',
+        position=1,
+        autorange='reversed',
+        rangemode='tozero',
+        gridcolor='lightgray',
+        gridwidth=2,
+        side='top',
+        range=x_range,
+        row=1,
+        col=track_num
+    )
+    fig.update_yaxes(
+        title=y_title,
+        ticks="inside",
+        autorange='reversed',
+        showline=True,
+        gridcolor='lightgray',
+        gridwidth=2,
+        showticklabels=True,
+        row=1,
+        col=track_num
+    )
+
+
+def build_log_figure(frame, tracks, top=None, bottom=None, render_mode='Auto', webgl_threshold=WEBGL_THRESHOLD, decimated=True):
+    '''One column per (curve, x_range) track, sharing a reversed depth axis.'''
+    height = PLOT_HEIGHT if decimated else None
+    fig = make_subplots(rows=1, cols=len(tracks), shared_yaxes=True)
+    for track_num, (column, x_range) in enumerate(tracks, start=1):
+        trace = go.Scatter(**track_xy(frame, column, top, bottom, height), name=track_name(column), legendgroup=f'track{track_num}')
+        fig.add_trace(trace, row=1, col=track_num)
+        configure_track(fig, track_num, column, x_range, 'Depth' if track_num == 1 else None)
+
+    fig.update_layout(
+        title=None,
+        height=PLOT_HEIGHT,
+        width=TRACK_WIDTH * len(tracks)
+    )
+    return apply_render_mode(fig, render_mode, webgl_threshold)
+
+
+def cached_log_figure(dataset_key, frame, tracks, top=None, bottom=None, render_mode='Auto', webgl_threshold=WEBGL_THRESHOLD):
+    '''build_log_figure memoised on (dataset, depth window, tracks, rendering) in the shared cache.
+
+    Toggling a track back to an earlier selection returns the figure built
+    then. Callers must treat the returned figure as read-only.
+    '''
+    key = ('figure', dataset_key, tuple((column, tuple(x_range)) for column, x_range in tracks), top, bottom, render_mode, webgl_threshold)
+    return shared_cache.shared.get_or_compute(
+        key, lambda: build_log_figure(frame, tracks, top, bottom, render_mode, webgl_threshold))
@@ -0,0 +1,63 @@
+import time
+
+import pandas as pd
+
+import shared_cache
+
+
+STATE_KEY = 'computation_graph'
+
+
+class ComputationGraph:
+    '''Named computation stages memoised in a session state mapping (st.session_state).
+
+    Each stage declares its inputs as a tuple of small hashable keys (dataset
+    key, curve, parameters, window...) and is recomputed only when they differ
+    from the inputs of its stored value. A new graph is made on every rerun;
+    the stored values persist, and the log records what this rerun did.
+    '''
+
+    def __init__(self, state, state_key=STATE_KEY):
+        if state_key not in state:
+            state[state_key] = {}
+        self.stages = state[state_key]
+        self.log = []
+
+    def stage(self, name, inputs, compute, shared=False):
+        '''Value of a stage, recomputed only when inputs change.
+
+        With shared=True the value also goes through the process-wide shared
+        cache under (name, *inputs), so other sessions reuse it.
+        '''
+        entry = self.stages.get(name)
+        if entry is not None and entry[0] == inputs:
+            self.log.append((name, 'hit', 0.0, inputs))
+            return entry[1]
+        start = time.perf_counter()
+        status = 'recomputed' if entry is not None else 'computed'
+        value = shared_cache.shared.get((name, *inputs)) if shared else None
+        if value is not None:
+            # Already computed by another session
+            status = 'shared'
+        elif shared:
+            value = shared_cache.shared.put((name, *inputs), compute())
+        else:
+            value = compute()
+        self.stages[name] = (inputs, value)
+        self.log.append((name, status, time.perf_counter() - start, inputs))
+        return value
+
+    def invalidate(self, name=None):
+        if name is None:
+            self.stages.clear()
+        else:
+            self.stages.pop(name, None)
+
+    def report(self):
+        # One row per stage run on this rerun, in execution order
+        return pd.DataFrame({
+            'Stage': [name for name, _, _, _ in self.log],
+            'Status': [status for _, status, _, _ in self.log],
+            'ms': [round(seconds * 1000, 2) for _, _, seconds, _ in self.log],
+            'Inputs': [repr(inputs)[:120] for _, _, _, inputs in self.log],
+        })
@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+
+from las_nulls import to_float64
+
+
+# Interval transit times (us/ft) used by the Wyllie time average equation
+MATRICES = {
+    'Sandstone': 55.5,
+    'Limestone': 47.5,
+    'Dolomite': 43.5,
+}
+FLUIDS = {
+    'Seawater': 185,
+    'Freshwater': 189,
+}
+# Hydrocarbon correction factor Hy of the corrected Wyllie equation
+HYDROCARBON_FACTORS = {
+    'None (water)': 1.0,
+    'Oil': 0.9,
+    'Gas': 0.7,
+}
+CORRECTED_PREFIX = 'Corrected '
+# Upper bound on the (samples, matrices, fluids) elements evaluated at once by a sweep
+CHUNK_ELEMENTS = 1 << 22
+# Largest samples x combinations the app holds at once (table, plots and prefix-sum index);
+# larger sweeps go through sonic_eval, which never holds them in full
+APP_ELEMENTS = 1 << 21
+
+
+def wyllie(sonic, dt_matrix, dt_fluid):
+    # phi = (dt_log - dt_matrix) / (dt_fluid - dt_matrix), broadcast over any shapes
+    dt_matrix = np.asarray(dt_matrix, dtype=np.float64)
+    dt_fluid = np.asarray(dt_fluid, dtype=np.float64)
+    return (sonic - dt_matrix) / (dt_fluid - dt_matrix)
+
+
+def shale_transit_time(depth, sonic, top, bottom):
+    # Mean sonic reading (us/ft) over a shale depth interval; NaN when it has no samples
+    depth = to_float64(depth)
+    sonic = to_float64(sonic)
+    window = (depth >= min(top, bottom)) & (depth <= max(top, bottom)) & ~np.isnan(sonic)
+    return float(sonic[window].mean()) if window.any() else float('nan')
+
+
+def compaction_factor(dt_shale):
+    '''Cp = dt_shale / 100; compacted shales (dt_shale <= 100 us/ft) need no correction.'''
+    if not np.isfinite(dt_shale):
+        return 1.0
+    return max(1.0, dt_shale / 100.0)
+
+
+def column_name(matrix, fluid):
+    return f'{matrix} ({fluid})'
+
+
+def split_column(name):
+    # 'Sandstone (Seawater)' -> ('Sandstone', 'Seawater')
+    matrix, fluid = name[:-1].rsplit(' (', 1)
+    return matrix, fluid
+
+
+class ParameterSet:
+    '''Named matrix and fluid interval transit times (us/ft); every matrix is paired with every fluid.'''
+
+    def __init__(self, matrices=None, fluids=None):
+        self.matrices = {str(name).strip(): float(dt) for name, dt in (MATRICES if matrices is None else matrices).items()}
+        self.fluids = {str(name).strip(): float(dt) for name, dt in (FLUIDS if fluids is None else fluids).items()}
+        if not self.matrices or not self.fluids:
+            raise ValueError('at least one matrix and one fluid are required')
+        if set(self.matrices.values()) & set(self.fluids.values()):
+            raise ValueError('a matrix and a fluid transit time must differ')
+        self.dt_matrix = np.fromiter(self.matrices.values(), dtype=np.float64)
+        self.dt_fluid = np.fromiter(self.fluids.values(), dtype=np.float64)
+
+    @classmethod
+    def grid(cls, dt_matrix, dt_fluid):
+        # Unnamed transit time grids, e.g. for uncertainty sweeps: 'Matrix 50' x 'Fluid 189'
+        return cls({f'Matrix {dt:g}': dt for dt in dt_matrix}, {f'Fluid {dt:g}': dt for dt in dt_fluid})
+
+    def __len__(self):
+        return len(self.matrices) * len(self.fluids)
+
+    @property
+    def key(self):
+        return tuple(self.matrices.items()), tuple(self.fluids.items())
+
+    def __eq__(self, other):
+        return isinstance(other, ParameterSet) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    @property
+    def columns(self):
+        return [column_name(matrix, fluid) for fluid in self.fluids for matrix in self.matrices]
+
+
+class PorosityResult:
+    '''Columnar porosity table shared by the data set table and the log plots.
+
+    phi has shape (samples, matrices, fluids); columns are named
+    "<Matrix> (<Fluid>)" and ordered fluid first, matrix second.
+    '''
+
+    def __init__(self, depth, sonic, phi, matrices, fluids):
+        self.depth = depth
+        self.sonic = sonic
+        self.phi = phi
+        self.matrices = list(matrices)
+        self.fluids = list(fluids)
+
+    def __len__(self):
+        return len(self.depth)
+
+    @property
+    def porosity_columns(self):
+        return [column_name(matrix, fluid) for fluid in self.fluids for matrix in self.matrices]
+
+    def column(self, name):
+        if name == 'Depth':
+            return self.depth
+        if name == 'Sonic Log':
+            return self.sonic
+        matrix, fluid = split_column(name)
+        return self.phi[:, self.matrices.index(matrix), self.fluids.index(fluid)]
+
+    def columns(self):
+        data = {'Depth': self.depth, 'Sonic Log': self.sonic}
+        for name in self.porosity_columns:
+            data[name] = self.column(name)
+        return data
+
+    def to_frame(self):
+        return pd.DataFrame(self.columns(), copy=False)
+
+    def corrected(self, cp=1.0, hy=1.0, decimals=4):
+        '''Corrected Wyllie porosity phi * Hy / Cp, named "Corrected <Matrix> (<Fluid>)".
+
+        Only rescales phi, so changing Cp or Hy never re-runs the sweep.
+        '''
+        phi = self.phi * (hy / cp)
+        if decimals is not None:
+            np.round(phi, decimals, out=phi)
+        return PorosityResult(self.depth, self.sonic, phi, [CORRECTED_PREFIX + m for m in self.matrices], self.fluids)
+
+
+def iter_sweep(sonic, parameters, decimals=4, chunk_elements=CHUNK_ELEMENTS):
+    '''Yield (start, stop, phi) blocks of (samples, matrices, fluids) porosity over depth chunks.
+
+    Each block holds at most chunk_elements values, so temporaries stay
+    bounded however many matrix/fluid combinations are swept.
+    '''
+    sonic = to_float64(sonic)
+    denominator = parameters.dt_fluid[None, None, :] - parameters.dt_matrix[None, :, None]
+    step = max(1, chunk_elements // len(parameters))
+    for start in range(0, len(sonic), step):
+        stop = min(start + step, len(sonic))
+        phi = np.subtract(sonic[start:stop, None, None], parameters.dt_matrix[None, :, None],
+                          np.empty((stop - start, len(parameters.matrices), len(parameters.fluids))))
+        np.divide(phi, denominator, out=phi)
+        if decimals is not None:
+            np.round(phi, decimals, out=phi)
+        yield start, stop, phi
+
+
+def sweep(depth, sonic, parameters=None, decimals=4, chunk_elements=CHUNK_ELEMENTS):
+    '''Porosity for every matrix/fluid combination of a ParameterSet, evaluated chunk by chunk.'''
+    parameters = ParameterSet() if parameters is None else parameters
+    depth = to_float64(depth)
+    sonic = to_float64(sonic)
+    phi = np.empty((len(sonic), len(parameters.matrices), len(parameters.fluids)))
+    for start, stop, block in iter_sweep(sonic, parameters, decimals, chunk_elements):
+        phi[start:stop] = block
+    return PorosityResult(depth, sonic, phi, parameters.matrices.keys(), parameters.fluids.keys())
+
+
+def compute_porosity(depth, sonic, matrices=None, fluids=None, decimals=4):
+    return sweep(depth, sonic, ParameterSet(matrices, fluids), decimals)
@@ -0,0 +1,126 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# Total size of everything the process keeps for reuse across sessions
+MEMORY_BUDGET = int(float(os.environ.get('SONIC_CACHE_BUDGET_MB', 512)) * 2 ** 20)
+
+
+def sizeof(value):
+    '''Approximate bytes held by a cached value: array buffers, DataFrames, wells and containers of them.'''
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    if isinstance(value, (tuple, list)):
+        return sum(sizeof(item) for item in value)
+    if isinstance(value, dict):
+        return sum(sizeof(item) for item in value.values())
+    nbytes = getattr(value, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if hasattr(value, 'to_plotly_json'):
+        # Plotly figure: the trace coordinates dominate
+        return sum(np.asarray(values).nbytes for trace in value.data for values in (trace.x, trace.y) if values is not None)
+    # Plain objects (PorosityResult, DepthIndex, ...): the arrays and frames they hold
+    members = [item for item in getattr(value, '__dict__', {}).values() if isinstance(item, (np.ndarray, pd.DataFrame))]
+    return sum(sizeof(item) for item in members) if members else sys.getsizeof(value)
+
+
+class SharedCache:
+    '''Process-wide cache of immutable values shared by every session, within a memory budget.
+
+    Keys are tuples whose first item names the kind of value ('well',
+    'frame', 'porosity', ...). Least recently used entries are evicted
+    until the total size fits the budget; hits, misses and evictions are
+    counted per kind. Cached values are shared, so callers must treat
+    them as read-only.
+    '''
+
+    def __init__(self, budget=MEMORY_BUDGET):
+        self.budget = budget
+        self.entries = OrderedDict()
+        self.total = 0
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def count(self, key, event):
+        counters = self.counters.setdefault(key[0], {'hits': 0, 'misses': 0, 'evictions': 0})
+        counters[event] += 1
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.count(key, 'misses')
+                return default
+            self.entries.move_to_end(key)
+            self.count(key, 'hits')
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        size = sizeof(value) if size is None else size
+        with self.lock:
+            if key in self.entries:
+                self.total -= self.entries.pop(key)[1]
+            # A value larger than the whole budget is returned but not kept
+            if size > self.budget:
+                return value
+            self.entries[key] = (value, size)
+            self.total += size
+            while self.total > self.budget:
+                old_key, (_, old_size) = self.entries.popitem(last=False)
+                self.total -= old_size
+                self.count(old_key, 'evictions')
+        return value
+
+    def get_or_compute(self, key, compute, size=None):
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, compute(), size)
+        return value
+
+    def discard(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.total -= entry[1]
+
+    def clear(self, kind=None):
+        # Everything, or only the entries of one kind
+        with self.lock:
+            for key in [key for key in self.entries if kind is None or key[0] == kind]:
+                self.total -= self.entries.pop(key)[1]
+
+    def stats(self):
+        # One row per kind of value: entries, MB held and the counters
+        with self.lock:
+            kinds = OrderedDict()
+            for key, (_, size) in self.entries.items():
+                row = kinds.setdefault(key[0], [0, 0])
+                row[0] += 1
+                row[1] += size
+            names = list(dict.fromkeys([*kinds, *self.counters]))
+            rows = []
+            for name in names:
+                entries, size = kinds.get(name, (0, 0))
+                counters = self.counters.get(name, {'hits': 0, 'misses': 0, 'evictions': 0})
+                rows.append({'Kind': name, 'Entries': entries, 'MB': size / 2 ** 20,
+                             'Hits': counters['hits'], 'Misses': counters['misses'], 'Evictions': counters['evictions']})
+        return pd.DataFrame(rows, columns=['Kind', 'Entries', 'MB', 'Hits', 'Misses', 'Evictions'])
+
+
+shared = SharedCache()
@@ -0,0 +1,75 @@
+from collections import OrderedDict
+
+import shared_cache
+import units
+
+
+# Compressional slowness mnemonics, most common first
+SONIC_MNEMONICS = ('DT', 'DTC', 'DTCO', 'DTCO_MPS', 'AC', 'DT4P', 'DTP', 'DTCOMP', 'DTL', 'DTLN', 'DTLF', 'DT24', 'ACCO', 'SONIC')
+# Shear slowness: still a sonic curve, but never the first choice for Wyllie porosity
+SHEAR_MNEMONICS = ('DTS', 'DTSM', 'DTSH', 'DT4S', 'DTSM_MPS', 'DTSD')
+DESCRIPTION_WORDS = ('SONIC', 'TRANSIT', 'SLOWNESS', 'COMPRESSIONAL', 'ACOUSTIC', 'DELTA-T', 'DELTA T')
+
+
+def base_mnemonic(mnemonic):
+    # 'dt:1' (a repeated curve) -> 'DT'
+    return mnemonic.split(':')[0].strip().upper()
+
+
+def sonic_score(item):
+    '''How likely a ~Curve item is the compressional sonic log, from its mnemonic, unit and description; 0 if not at all.'''
+    base = base_mnemonic(item.mnemonic)
+    descr = str(item.descr or '').upper()
+    score = 0
+    if base in SONIC_MNEMONICS:
+        score += 100 - SONIC_MNEMONICS.index(base)
+    elif base in SHEAR_MNEMONICS:
+        score += 20
+    elif base.startswith('DT'):
+        score += 30
+    if units.is_sonic_unit(item.unit):
+        score += 50
+    if any(word in descr for word in DESCRIPTION_WORDS):
+        score += 25
+    # Shear slowness and sonic-derived porosity curves mention 'sonic' too
+    if 'SHEAR' in descr or 'POROSITY' in descr:
+        score -= 40
+    return max(score, 0)
+
+
+class SonicCurveIndex:
+    '''Mnemonic index of one file's ~Curve block, with the sonic candidates ranked best first.'''
+
+    def __init__(self, curves):
+        items = list(curves.values())
+        self.mnemonics = [item.mnemonic for item in items]
+        self.by_mnemonic = OrderedDict((base_mnemonic(item.mnemonic), item.mnemonic) for item in reversed(items))
+        # Depth index excluded; stable sort keeps ~Curve order between equal scores
+        scored = [(item.mnemonic, sonic_score(item)) for item in items[1:]]
+        self.candidates = sorted((pair for pair in scored if pair[1] > 0), key=lambda pair: -pair[1])
+
+    @property
+    def best(self):
+        return self.candidates[0][0] if self.candidates else None
+
+    def ranked(self):
+        return [mnemonic for mnemonic, _ in self.candidates]
+
+    def lookup(self, mnemonic):
+        # Case-insensitive match of a requested mnemonic, else None
+        if not mnemonic:
+            return None
+        if mnemonic in self.mnemonics:
+            return mnemonic
+        return self.by_mnemonic.get(base_mnemonic(mnemonic))
+
+    def resolve(self, preferred=None):
+        '''The preferred curve if the file has it, else the best ranked candidate.'''
+        return self.lookup(preferred) or self.best
+
+
+def sonic_index(well):
+    '''SonicCurveIndex of a loaded well, built once per dataset key.'''
+    if well.key is None:
+        return SonicCurveIndex(well.curves)
+    return shared_cache.shared.get_or_compute(('sonic_index', well.key), lambda: SonicCurveIndex(well.curves))
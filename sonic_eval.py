@@ -0,0 +1,151 @@
+'''Headless formation evaluation: load -> null-normalise -> gap fill -> porosity -> categorise.
+
+Runs the same pipeline as the Formation Evaluation tab on one or many LAS
+files (or directories of them) and writes one statistics row per
+matrix/fluid per well. Only the numeric core is imported; Streamlit,
+Plotly, matplotlib and lasio are not.
+
+Usage: python sonic_eval.py [options] PATH [PATH ...]
+'''
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+import batch
+import las_sidecar
+import las_stream
+import porosity
+import zonation
+
+
+FORMATS = ('csv', 'parquet', 'json')
+
+
+def load_well(path, curves=None):
+    # Sidecar when it is up to date (memory-mapped), otherwise stream only the depth and the given curves
+    well = las_sidecar.load_fresh_sidecar(path)
+    return well if well is not None else las_stream.read_well(path, curves)
+
+
+def collect_sources(paths):
+    sources = []
+    for path in paths:
+        sources += batch.list_las_files(path) if os.path.isdir(path) else [path]
+    return sources
+
+
+def transit_times(specs, label):
+    # 'Sandstone=55.5', a bare 55.5, or an inclusive START:STOP:STEP grid
+    times = {}
+    for spec in specs:
+        if '=' in spec:
+            name, value = spec.split('=', 1)
+            times[name.strip()] = float(value)
+        elif ':' in spec:
+            start, stop, step = (float(part) for part in spec.split(':'))
+            for value in np.arange(start, stop + step / 2, step):
+                times[f'{label} {value:g}'] = float(value)
+        else:
+            times[f'{label} {float(spec):g}'] = float(spec)
+    return times or None
+
+
+def parameter_set(args):
+    if not args.matrix and not args.fluid:
+        return None
+    return porosity.ParameterSet(transit_times(args.matrix, 'Matrix'), transit_times(args.fluid, 'Fluid'))
+
+
+def read_zones(path, parameters):
+    # Matrix and fluid names resolve against the swept transit times, else the built-in set
+    if path is None:
+        return None
+    with open(path, 'rb') as f:
+        return zonation.Zonation.from_table(zonation.read_intervals(f.read()), parameters)
+
+
+def results_table(result):
+    tables = []
+    for summary, stats in zip(result.summaries, result.stats):
+        if stats is None:
+            continue
+        stats = stats.copy()
+        stats.insert(0, 'Sonic curve', summary['Sonic curve'])
+        stats.insert(0, 'Well', summary['Well'])
+        stats.insert(0, 'Source', summary['Source'])
+        tables.append(stats)
+    return pd.concat(tables, ignore_index=True) if tables else pd.DataFrame()
+
+
+def write_table(table, output, fmt):
+    if fmt == 'csv':
+        table.to_csv(output, index=False)
+    elif fmt == 'parquet':
+        table.to_parquet(output, index=False)
+    else:
+        table.to_json(output, orient='records', indent=2)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Sonic porosity formation evaluation for LAS files.')
+    parser.add_argument('paths', nargs='+', help='LAS files or directories containing LAS files')
+    parser.add_argument('-c', '--curve', help='sonic curve mnemonic (default: detect)')
+    parser.add_argument('--top', type=float, help='top depth of the evaluation window')
+    parser.add_argument('--bottom', type=float, help='bottom depth of the evaluation window')
+    parser.add_argument('--matrix', action='append', default=[], metavar='SPEC',
+                        help='matrix transit time as NAME=DT, DT or START:STOP:STEP (repeatable; default: built-in set)')
+    parser.add_argument('--fluid', action='append', default=[], metavar='SPEC',
+                        help='fluid transit time as NAME=DT, DT or START:STOP:STEP (repeatable; default: built-in set)')
+    parser.add_argument('--zones', metavar='FILE',
+                        help='interval CSV (top, base, lithology, fluid) for an extra zoned porosity row per well')
+    parser.add_argument('--max-gap', type=float, help='longest null gap to interpolate, in depth units (default: any)')
+    parser.add_argument('-f', '--format', choices=FORMATS, help='output format (default: from the output suffix, else csv)')
+    parser.add_argument('-o', '--output', default='-', help="output file, '-' for stdout (default)")
+    parser.add_argument('-j', '--workers', type=int, help='worker processes (default: one per CPU)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    fmt = args.format or os.path.splitext(args.output)[1].lstrip('.').lower()
+    if fmt not in FORMATS:
+        fmt = 'csv'
+    if fmt == 'parquet' and args.output == '-':
+        print('sonic_eval: parquet output needs --output FILE', file=sys.stderr)
+        return 2
+
+    try:
+        parameters = parameter_set(args)
+        zones = read_zones(args.zones, parameters)
+    except (OSError, ValueError) as error:
+        print(f'sonic_eval: {error}', file=sys.stderr)
+        return 2
+
+    sources = collect_sources(args.paths)
+    if not sources:
+        print('sonic_eval: no LAS files found', file=sys.stderr)
+        return 2
+
+    result = batch.run_batch(sources, args.curve, args.top, args.bottom, args.workers, loader=load_well, max_gap=args.max_gap, parameters=parameters, zones=zones)
+    table = results_table(result)
+    try:
+        write_table(table, sys.stdout if args.output == '-' else args.output, fmt)
+    except ImportError as error:
+        print(f'sonic_eval: {error}', file=sys.stderr)
+        return 2
+
+    for summary in result.summaries:
+        if summary['Error']:
+            print(f"sonic_eval: {summary['Source']}: {summary['Error']}", file=sys.stderr)
+    throughput = result.throughput()
+    print(f"sonic_eval: {throughput['Wells']} wells, {throughput['Rows']} rows in {throughput['Seconds']:.2f} s "
+          f"({throughput['Wells/sec']:.1f} wells/s, {throughput['Rows/sec']:,.0f} rows/s, "
+          f"{throughput['Workers']} workers)", file=sys.stderr)
+    return 1 if any(summary['Error'] for summary in result.summaries) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import evaluation
+
+
+COLUMNS = ['Sandstone (Water)', 'Limestone (Oil)']
+
+
+def random_well(seed, n=500, descending=False):
+    rng = np.random.default_rng(seed)
+    depth = 1000.0 + np.cumsum(rng.uniform(0.1, 1.0, n))
+    values = rng.uniform(-0.2, 1.2, (n, len(COLUMNS)))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    if descending:
+        depth, values = depth[::-1], values[::-1]
+    return depth, values
+
+
+@pytest.mark.parametrize('descending', [False, True])
+def test_index_matches_statistics(descending):
+    depth, values = random_well(0, descending=descending)
+    index = evaluation.DepthIndex(depth, values, COLUMNS, chunk_elements=100)
+    rng = np.random.default_rng(1)
+    windows = [(None, None), (None, 1100.0), (1100.0, None)]
+    windows += [tuple(sorted(rng.uniform(990.0, 1300.0, 2))) for _ in range(20)]
+    # A sample depth at each end, so both edges of the window are inclusive
+    windows.append((depth[10], depth[200]))
+    for top, bottom in windows:
+        pd.testing.assert_frame_equal(index.statistics(top, bottom),
+                                      evaluation.porosity_statistics(depth, values, COLUMNS, top, bottom),
+                                      atol=1e-4)
+
+
+@pytest.mark.parametrize('top, bottom', [(0.0, 10.0), (2000.0, 3000.0), (1100.0, 1000.0)])
+def test_empty_and_inverted_windows(top, bottom):
+    depth, values = random_well(2)
+    stats = evaluation.DepthIndex(depth, values, COLUMNS).statistics(top, bottom)
+    pd.testing.assert_frame_equal(stats, evaluation.porosity_statistics(depth, values, COLUMNS, top, bottom))
+    assert (stats['Total'] == 0).all()
+    assert stats['Normal %'].isna().all()
+    assert stats['Weighted average porosity'].isna().all()
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+import interpolation
+
+
+DEPTH = np.arange(10) * 0.5
+# Leading null, a gap 1.0 wide (index 2), a gap 1.5 wide (5 and 6) and a trailing null
+VALUES = np.array([np.nan, 1.0, np.nan, 3.0, 4.0, np.nan, np.nan, 7.0, 8.0, np.nan])
+
+
+@pytest.mark.parametrize('max_gap, filled', [
+    (None, [2, 5, 6]),
+    (0, [2, 5, 6]),
+    (0.9, []),
+    (1.0, [2]),
+    (1.4, [2]),
+    (1.5, [2, 5, 6]),
+])
+def test_max_gap(max_gap, filled):
+    result = interpolation.fill_gaps(DEPTH, VALUES, max_gap)
+    expected = VALUES.copy()
+    expected[filled] = np.arange(10.0)[filled]
+    np.testing.assert_allclose(result, expected)
+
+
+def test_descending_depth():
+    result = interpolation.fill_gaps(DEPTH[::-1], VALUES[::-1], 1.0)
+    np.testing.assert_allclose(result, interpolation.fill_gaps(DEPTH, VALUES, 1.0)[::-1])
+
+
+def test_nothing_to_fill():
+    np.testing.assert_array_equal(interpolation.fill_gaps(DEPTH, np.arange(10.0)), np.arange(10.0))
+    np.testing.assert_array_equal(interpolation.fill_gaps(DEPTH, np.full(10, np.nan)), np.full(10, np.nan))
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import las_cache
+import las_stream
+
+
+BUNDLED_FILES = ('Sample.las', 'LAS_1.las', 'LAS_2.las', 'LAS_3.las', 'LAS_4.las')
+
+HEADER = '''~Version
+VERS.   2.0 :
+WRAP.   NO  :
+~Well
+NULL.   -999.25 :
+~Curve
+DEPT.M    :
+Gamma.GAPI :
+DT.US/F   :
+~A
+'''
+
+
+def write_las(tmp_path, data, header=HEADER):
+    path = tmp_path / 'well.las'
+    path.write_text(header + data)
+    return str(path)
+
+
+@pytest.mark.parametrize('name', BUNDLED_FILES)
+def test_matches_lasio(name):
+    pytest.importorskip('lasio')
+    with open(name, 'rb') as f:
+        expected = las_cache.parse_with_lasio(f.read())
+    well = las_stream.read_well(name)
+    assert list(well.curves) == list(expected.curves)
+    assert [item.unit for item in well.curves.values()] == [item.unit for item in expected.curves.values()]
+    for mnemonic in expected.curves:
+        np.testing.assert_array_equal(well.data[mnemonic], expected.data[mnemonic])
+
+
+def test_selected_curves_only():
+    well = las_stream.read_well('Sample.las', ['DT'])
+    assert list(well.curves) == ['DEPT', 'DT']
+    np.testing.assert_array_equal(well.data['DT'], las_stream.read_well('Sample.las').data['DT'])
+
+
+def test_bad_lines_do_not_shift_rows(tmp_path):
+    path = write_las(tmp_path, '100.0 1.0 50.0\n100.5 2.030.0\n101.0 3.0\n101.5 4.0 52.0 9.0\n102.0 5.0-53.0\n102.5 6.0 54.0\n')
+    reader = las_stream.LASStreamReader(path)
+    block = np.concatenate([block for _, block in reader.iter_blocks()])
+    # Run-on '2.030.0' reads as two NaN, the short line is NaN-padded, the long one rejected
+    np.testing.assert_array_equal(block[:, 0], [100.0, 100.5, 101.0, 102.0, 102.5])
+    np.testing.assert_array_equal(block[:, 2], [50.0, np.nan, np.nan, -53.0, 54.0])
+    assert reader.rejected_rows == 1
+
+
+def test_mnemonics_upper_case(tmp_path):
+    well = las_stream.read_well(write_las(tmp_path, '100.0 1.0 50.0\n'))
+    assert list(well.curves) == ['DEPT', 'GAMMA', 'DT']
+
+
+def test_no_curves(tmp_path):
+    path = write_las(tmp_path, '100.0 1.0\n', HEADER.split('~Curve')[0] + '~Curve\n~A\n')
+    with pytest.raises(ValueError):
+        las_stream.read_well(path)
+
+
+def test_bracketed_units(tmp_path):
+    header = HEADER.replace('DEPT.M ', 'DEPT.[M]').replace('DT.US/F ', 'DT.[US/M]')
+    well = las_stream.read_well(write_las(tmp_path, '100.0 1.0 100.0\n', header))
+    assert well.curves['DEPT'].unit == 'M'
+    assert well.curves['DT'].unit == 'US/F'
+    np.testing.assert_allclose(well.data['DT'], [30.48])
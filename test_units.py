@@ -0,0 +1,39 @@
+from collections import OrderedDict
+
+import numpy as np
+
+import units
+from las_data import HeaderItem, WellData
+
+
+def make_well(dt_unit):
+    curves = OrderedDict([
+        ('DEPT', HeaderItem('DEPT', 'M', '', 'Depth')),
+        ('DT', HeaderItem('DT', dt_unit, '', 'Sonic')),
+        ('GR', HeaderItem('GR', 'GAPI', '', 'Gamma ray')),
+    ])
+    data = OrderedDict([
+        ('DEPT', np.array([100.0, 100.5, 101.0])),
+        ('DT', np.array([328.0, np.nan, 200.0])),
+        ('GR', np.array([50.0, 60.0, 70.0])),
+    ])
+    return WellData(OrderedDict(), curves, data)
+
+
+def test_convert_well():
+    well = make_well('us/m')
+    converted = units.convert_well(well)
+    assert converted.curves['DT'].unit == units.US_PER_FT
+    assert units.converted_from(converted.curves['DT']) == 'us/m'
+    np.testing.assert_allclose(converted.data['DT'], [328.0 * 0.3048, np.nan, 200.0 * 0.3048])
+    # Depth and non-sonic curves are left alone, and the original well is not modified
+    assert converted.data['DEPT'] is well.data['DEPT']
+    assert converted.data['GR'] is well.data['GR']
+    assert well.curves['DT'].unit == 'us/m'
+    # Converting twice is a no-op
+    assert units.convert_well(converted) is converted
+
+
+def test_us_per_ft_unchanged():
+    well = make_well('uSec/Ft')
+    assert units.convert_well(well) is well
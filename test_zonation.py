@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import zonation
+
+
+def test_shared_boundary_belongs_to_deeper_zone():
+    zones = zonation.Zonation([200.0, 100.0], [300.0, 200.0], [47.6, 55.5], [189.0, 189.0])
+    depth = [99.9, 100.0, 150.0, 200.0, 250.0, 300.0, 300.1]
+    np.testing.assert_array_equal(zones.zone_index(depth), [-1, 0, 0, 1, 1, 1, -1])
+
+
+def test_porosity_uses_zone_parameters():
+    zones = zonation.Zonation([100.0, 200.0], [200.0, 300.0], [55.5, 47.6], [189.0, 189.0])
+    phi = zones.porosity([50.0, 200.0, 199.0], [100.0, 100.0, 100.0])
+    assert np.isnan(phi[0])
+    assert phi[1] == pytest.approx((100.0 - 47.6) / (189.0 - 47.6), abs=1e-4)
+    assert phi[2] == pytest.approx((100.0 - 55.5) / (189.0 - 55.5), abs=1e-4)
+
+
+def test_overlapping_zones():
+    with pytest.raises(ValueError):
+        zonation.Zonation([100.0, 150.0], [200.0, 300.0], [55.5, 47.6], [189.0, 189.0])
+
+
+def test_read_intervals():
+    table = zonation.read_intervals(b'top;bottom;lithology;fluid\n100;200;Sandstone;Freshwater\n')
+    assert list(table.columns) == list(zonation.TABLE_COLUMNS)
+    zones = zonation.Zonation.from_table(table)
+    assert len(zones) == 1
+    with pytest.raises(ValueError):
+        zonation.read_intervals(b'')
@@ -0,0 +1,70 @@
+import re
+
+import numpy as np
+
+
+# Sonic (slowness) curves are converted to this unit when a well is loaded
+US_PER_FT = 'US/F'
+# Multiplier to us/ft, keyed on the normalised unit string
+TO_US_PER_FT = {
+    'US/FT': 1.0,
+    'US/F': 1.0,
+    'USPF': 1.0,
+    'US/M': 0.3048,
+    'USPM': 0.3048,
+}
+
+
+def strip_brackets(unit):
+    # '[US/M]' or '(US/M)' -> 'US/M', as lasio reads bracketed LAS units
+    unit = unit.strip()
+    if len(unit) >= 2 and unit[0] + unit[-1] in ('[]', '()'):
+        return unit[1:-1]
+    return unit
+
+
+def normalise_unit(unit):
+    # 'µs/ft', 'uSec/Ft', 'us / m', '[US/M]' -> 'US/FT', 'US/FT', 'US/M', 'US/M'
+    unit = str(unit or '').replace('µ', 'U').replace('μ', 'U').upper()
+    unit = strip_brackets(re.sub(r'\s+', '', unit))
+    return re.sub(r'^(USEC|MICROSEC(OND)?S?)', 'US', unit)
+
+
+def sonic_factor(unit):
+    '''Multiplier taking a sonic curve in `unit` to us/ft, or None if it is not a sonic unit.'''
+    return TO_US_PER_FT.get(normalise_unit(unit))
+
+
+def is_sonic_unit(unit):
+    return sonic_factor(unit) is not None
+
+
+def convert_well(well):
+    '''WellData with every per-metre sonic curve scaled to us/ft (one vectorised multiply each).
+
+    The curve's unit becomes US/F and its description records the original
+    unit, so the conversion is visible and never applied twice.
+    '''
+    index = well.index_mnemonic
+    converted = {}
+    for mnemonic, item in well.curves.items():
+        factor = sonic_factor(item.unit)
+        if mnemonic != index and factor not in (None, 1.0):
+            converted[mnemonic] = factor
+    if not converted:
+        return well
+    curves = type(well.curves)(
+        (mnemonic, item._replace(unit=US_PER_FT, descr=f'{item.descr} (converted from {item.unit})'.strip())
+         if mnemonic in converted else item)
+        for mnemonic, item in well.curves.items())
+    data = type(well.data)(
+        (mnemonic, np.multiply(array, converted[mnemonic]) if mnemonic in converted else array)
+        for mnemonic, array in well.data.items())
+    # Scaling leaves the nulls where they were
+    return type(well)(well.header, curves, data, well.other, well._null_mask)
+
+
+def converted_from(item):
+    # Original unit of a curve converted by convert_well, else None
+    match = re.search(r'\(converted from (.+)\)$', item.descr or '')
+    return match.group(1) if match else None
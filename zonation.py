@@ -0,0 +1,118 @@
+'''Lithology zonation: depth intervals, each with its own matrix and fluid transit time.
+
+Zones come from a table (Top, Base, Matrix, Fluid) typed in the app or read
+from a striplog-style interval CSV (top, base, lithology, fluid). Every
+sample is mapped to its zone by binary search over the sorted zone tops, so
+zoned porosity is one vectorised Wyllie pass however many zones there are.
+'''
+import csv
+import io
+
+import numpy as np
+import pandas as pd
+
+import porosity
+from las_nulls import to_float64
+
+
+ZONED_COLUMN = 'Zoned porosity'
+TABLE_COLUMNS = ('Top', 'Base', 'Matrix', 'Fluid')
+# Accepted header names of an interval file, lower case
+COLUMN_ALIASES = {
+    'top': 'Top', 'from': 'Top',
+    'base': 'Base', 'bottom': 'Base', 'to': 'Base',
+    'matrix': 'Matrix', 'lithology': 'Matrix', 'lith': 'Matrix', 'rock': 'Matrix',
+    'fluid': 'Fluid',
+}
+
+
+def transit_time(value, table, kind):
+    # A name from the parameter table (any case) or a transit time in us/ft
+    names = {str(name).strip().casefold(): dt for name, dt in table.items()}
+    text = str(value).strip()
+    if text.casefold() in names:
+        return names[text.casefold()]
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f'unknown {kind} {text!r}') from None
+
+
+def read_intervals(data):
+    '''Zone table (Top, Base, Matrix, Fluid) from striplog-style interval CSV text or bytes.
+
+    The delimiter is sniffed; header names are matched case-insensitively
+    (top / base or bottom, lithology or matrix, fluid).
+    '''
+    if isinstance(data, bytes):
+        data = data.decode('utf-8', errors='replace')
+    try:
+        frame = pd.read_csv(io.StringIO(data), sep=None, engine='python', skipinitialspace=True)
+    except (csv.Error, pd.errors.EmptyDataError, pd.errors.ParserError) as error:
+        raise ValueError(f'cannot read interval file: {error}') from None
+    frame = frame.rename(columns=lambda name: COLUMN_ALIASES.get(str(name).strip().lower(), name))
+    missing = [name for name in TABLE_COLUMNS if name not in frame]
+    if missing:
+        raise ValueError(f'interval file has no {", ".join(missing)} column')
+    return frame[list(TABLE_COLUMNS)]
+
+
+class Zonation:
+    '''Non-overlapping depth zones sorted by top, with per-zone matrix and fluid transit times (us/ft).'''
+
+    def __init__(self, tops, bases, dt_matrix, dt_fluid):
+        tops, bases = to_float64(tops), to_float64(bases)
+        dt_matrix, dt_fluid = to_float64(dt_matrix), to_float64(dt_fluid)
+        # Zones may be given either way up; tops are the shallower depth
+        tops, bases = np.minimum(tops, bases), np.maximum(tops, bases)
+        order = np.argsort(tops, kind='stable')
+        self.tops, self.bases = tops[order], bases[order]
+        self.dt_matrix, self.dt_fluid = dt_matrix[order], dt_fluid[order]
+        if len(self.tops) == 0:
+            raise ValueError('at least one zone is required')
+        if np.isnan(self.tops).any() or np.isnan(self.dt_matrix).any() or np.isnan(self.dt_fluid).any():
+            raise ValueError('every zone needs a top, a base, a matrix and a fluid')
+        if (self.dt_matrix == self.dt_fluid).any():
+            raise ValueError('a matrix and a fluid transit time must differ')
+        overlap = np.flatnonzero(self.tops[1:] < self.bases[:-1])
+        if len(overlap):
+            raise ValueError(f'zones overlap at {self.tops[overlap[0] + 1]:g}')
+
+    @classmethod
+    def from_table(cls, table, parameters=None):
+        '''Zonation from a (Top, Base, Matrix, Fluid) table; names resolve against a ParameterSet.'''
+        parameters = porosity.ParameterSet() if parameters is None else parameters
+        table = table.dropna(how='all')
+        if table[list(TABLE_COLUMNS)].isna().any(axis=None):
+            raise ValueError('every zone needs a top, a base, a matrix and a fluid')
+        dt_matrix = [transit_time(value, parameters.matrices, 'matrix') for value in table['Matrix']]
+        dt_fluid = [transit_time(value, parameters.fluids, 'fluid') for value in table['Fluid']]
+        return cls(pd.to_numeric(table['Top'], errors='coerce'), pd.to_numeric(table['Base'], errors='coerce'),
+                   dt_matrix, dt_fluid)
+
+    def __len__(self):
+        return len(self.tops)
+
+    @property
+    def key(self):
+        return self.tops.tobytes(), self.bases.tobytes(), self.dt_matrix.tobytes(), self.dt_fluid.tobytes()
+
+    def zone_index(self, depth):
+        '''Zone of every depth sample, -1 outside all zones; a shared boundary belongs to the deeper zone.'''
+        depth = to_float64(depth)
+        index = np.searchsorted(self.tops, depth, 'right') - 1
+        inside = index >= 0
+        inside[inside] = depth[inside] <= self.bases[index[inside]]
+        index[~inside] = -1
+        return index
+
+    def porosity(self, depth, sonic, decimals=4):
+        '''Wyllie porosity with each sample's zone parameters; NaN outside the zonation.'''
+        index = self.zone_index(depth)
+        # Index -1 reads the appended NaN, so samples outside every zone give NaN porosity
+        dt_matrix = np.append(self.dt_matrix, np.nan)[index]
+        dt_fluid = np.append(self.dt_fluid, np.nan)[index]
+        phi = porosity.wyllie(to_float64(sonic), dt_matrix, dt_fluid)
+        if decimals is not None:
+            np.round(phi, decimals, out=phi)
+        return phi